@@ -47,6 +47,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'inventaris.middleware.CurrentUserMiddleware',
+    'inventaris.middleware.AuditBufferMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -126,6 +127,33 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Finished background export files are removed after this many seconds.
+EXPORT_JOB_TTL = 60 * 60 * 24
+# A running export job that has not reported progress for this many seconds
+# is assumed to have lost its worker and is handed to the next one.
+EXPORT_JOB_STALE_AFTER = 60 * 15
+
+# Rendered PDF/Excel reports are cached on disk and evicted least recently used first.
+EXPORT_CACHE_DIR = BASE_DIR / 'cache' / 'exports'
+EXPORT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+EXPORT_CACHE_MAX_ENTRY_BYTES = 64 * 1024 * 1024
+
+# Worker processes for large PDF reports rendered by the export worker and
+# management commands (web requests render serially); None uses every CPU core.
+REPORT_PDF_WORKERS = None
+
+# Generated QR code PNGs, keyed by a hash of their payload.
+QR_CACHE_DIR = BASE_DIR / 'cache' / 'qrcodes'
+
+# Asset codes reserved per process at a time; above 1, unused codes leave gaps
+# (see docs/INVENTARIS_DESIGN.md, 3.2).
+ASSET_CODE_BLOCK_SIZE = 1
+
+# Audit entries older than the retention period are moved to gzip JSONL segments
+# by the archive_audit_log command; the audit view still reads them.
+AUDIT_ARCHIVE_DIR = BASE_DIR / 'archive' / 'audit'
+AUDIT_RETENTION_DAYS = 365
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
 
@@ -4,17 +4,22 @@ from .models import (
     Asset,
     AssetCodeCounter,
     AssetDeletion,
+    AssetLatestReading,
     AssetLocationHistory,
     AssetMeterReading,
     AssetPhoto,
     AssetResponsibility,
+    AssetStateCheckpoint,
     AuditLog,
     Category,
+    ExportJob,
+    InventorySummary,
     Loan,
     Location,
     Maintenance,
     MaintenancePhoto,
     MaintenanceSchedule,
+    ScheduleDueState,
 )
 
 
@@ -118,3 +123,33 @@ class AuditLogAdmin(admin.ModelAdmin):
 @admin.register(AssetCodeCounter)
 class AssetCodeCounterAdmin(admin.ModelAdmin):
     list_display = ("year", "month", "counter")
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ("report_type", "file_format", "status", "rows_processed", "requested_by", "created_at")
+    list_filter = ("report_type", "file_format", "status")
+
+
+@admin.register(InventorySummary)
+class InventorySummaryAdmin(admin.ModelAdmin):
+    list_display = ("category", "location", "status", "condition", "count")
+    list_filter = ("status", "condition", "category")
+
+
+@admin.register(ScheduleDueState)
+class ScheduleDueStateAdmin(admin.ModelAdmin):
+    list_display = ("schedule", "trigger_type", "state", "next_due_date", "current_usage", "next_due_usage")
+    list_filter = ("trigger_type", "state")
+
+
+@admin.register(AssetLatestReading)
+class AssetLatestReadingAdmin(admin.ModelAdmin):
+    list_display = ("asset", "reading_type", "reading_value", "reading_at")
+    list_filter = ("reading_type",)
+
+
+@admin.register(AssetStateCheckpoint)
+class AssetStateCheckpointAdmin(admin.ModelAdmin):
+    list_display = ("asset", "taken_at", "status", "condition", "location")
+    list_filter = ("status", "condition")
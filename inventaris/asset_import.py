@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import csv
+import io
+import itertools
+import zipfile
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Iterable, Iterator
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from . import search, summary
+from .models import (
+    Asset,
+    AssetCodeCounter,
+    AssetLocationHistory,
+    AssetResponsibility,
+    Category,
+    DataVersion,
+    Location,
+)
+
+IMPORT_BATCH_SIZE = 500
+
+# Accept both field names and the Indonesian headers used by the report exports.
+HEADER_ALIASES = {
+    "name": "name",
+    "nama": "name",
+    "category": "category",
+    "kategori": "category",
+    "acquired_date": "acquired_date",
+    "tanggal perolehan": "acquired_date",
+    "tanggal_perolehan": "acquired_date",
+    "location": "location",
+    "lokasi": "location",
+    "status": "status",
+    "condition": "condition",
+    "kondisi": "condition",
+    "responsible_users": "responsible_users",
+    "penanggung jawab": "responsible_users",
+    "penanggung_jawab": "responsible_users",
+}
+REQUIRED_COLUMNS = ("name", "category", "acquired_date", "location")
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y")
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+    codes: list[str] = field(default_factory=list)
+
+    def as_dict(self, max_errors: int = 100) -> dict:
+        return {
+            "created": self.created,
+            "error_count": len(self.errors),
+            "errors": [{"line": line, "error": message} for line, message in self.errors[:max_errors]],
+            "first_code": self.codes[0] if self.codes else None,
+            "last_code": self.codes[-1] if self.codes else None,
+        }
+
+
+def iter_xlsx_rows(fileobj) -> Iterator[tuple[int, list]]:
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        wb = load_workbook(fileobj, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError) as exc:
+        raise ValueError("File XLSX tidak dapat dibaca.") from exc
+    try:
+        for index, row in enumerate(wb.worksheets[0].iter_rows(values_only=True), start=1):
+            yield index, list(row)
+    finally:
+        wb.close()
+
+
+def iter_csv_rows(fileobj) -> Iterator[tuple[int, list]]:
+    reader = csv.reader(fileobj)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def records_from_rows(rows: Iterable[tuple[int, list]]) -> Iterator[tuple[int, dict]]:
+    """Map the header row onto known columns and yield ``(line, record)``."""
+    rows = iter(rows)
+    for _line, header in rows:
+        if any(cell not in (None, "") for cell in header):
+            break
+    else:
+        return
+    columns = [HEADER_ALIASES.get(str(cell or "").strip().lower()) for cell in header]
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ada: {', '.join(missing)}.")
+    for line, row in rows:
+        if all(cell in (None, "") for cell in row):
+            continue
+        yield line, {
+            column: value for column, value in zip(columns, row) if column is not None
+        }
+
+
+def _text(value) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _parse_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = _text(value)
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Tanggal perolehan tidak valid: {text or '-'}.")
+
+
+def _choice(value, choices, default: str, label: str) -> str:
+    text = _text(value)
+    if not text:
+        return default
+    for key, display in choices:
+        if text.upper() == key or text.lower() == display.lower():
+            return key
+    raise ValueError(f"{label} tidak dikenal: {text}.")
+
+
+class _Lookups:
+    """Category, location and user maps, loaded once per import."""
+
+    def __init__(self):
+        self.categories: dict[str, int] = {}
+        for pk, code, name in Category.objects.values_list("pk", "code", "name"):
+            self.categories[code.lower()] = pk
+            self.categories.setdefault(name.lower(), pk)
+            self.categories[f"{code} - {name}".lower()] = pk
+        self.locations: dict[str, int | None] = {}
+        for pk, name in Location.objects.values_list("pk", "name"):
+            key = name.lower()
+            # Duplicate names are ambiguous; those rows must use the id.
+            self.locations[key] = None if key in self.locations else pk
+            self.locations[str(pk)] = pk
+        self.users = dict(get_user_model().objects.values_list("username", "pk"))
+
+    def category(self, value) -> int:
+        pk = self.categories.get(_text(value).lower())
+        if pk is None:
+            raise ValueError(f"Kategori tidak ditemukan: {_text(value) or '-'}.")
+        return pk
+
+    def location(self, value) -> int:
+        text = _text(value)
+        if isinstance(value, float) and value.is_integer():
+            text = str(int(value))
+        key = text.lower()
+        if key not in self.locations:
+            raise ValueError(f"Lokasi tidak ditemukan: {text or '-'}.")
+        if self.locations[key] is None:
+            raise ValueError(f"Nama lokasi {text} tidak unik, gunakan ID lokasi.")
+        return self.locations[key]
+
+    def users_for(self, value) -> list[int]:
+        names = [name.strip() for name in _text(value).replace(";", ",").split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.users]
+        if unknown:
+            raise ValueError(f"User tidak ditemukan: {', '.join(unknown)}.")
+        return list(dict.fromkeys(self.users[name] for name in names))
+
+
+def _build(record: dict, lookups: _Lookups, user) -> tuple[Asset, list[int]]:
+    name = _text(record.get("name"))
+    if not name:
+        raise ValueError("Nama aset kosong.")
+    asset = Asset(
+        name=name[:200],
+        category_id=lookups.category(record.get("category")),
+        acquired_date=_parse_date(record.get("acquired_date")),
+        current_location_id=lookups.location(record.get("location")),
+        status=_choice(record.get("status"), Asset.STATUS_CHOICES, Asset.STATUS_AKTIF, "Status"),
+        condition=_choice(
+            record.get("condition"), Asset.CONDITION_CHOICES, Asset.CONDITION_BAIK, "Kondisi"
+        ),
+        created_by=user,
+        updated_by=user,
+    )
+    return asset, lookups.users_for(record.get("responsible_users"))
+
+
+def _create_batch(batch: list[tuple[Asset, list[int]]], user) -> list[Asset]:
+    by_month: dict[tuple[int, int], list[Asset]] = defaultdict(list)
+    for asset, _users in batch:
+        by_month[(asset.acquired_date.year, asset.acquired_date.month)].append(asset)
+    for (year, month), assets in by_month.items():
+        for asset, code in zip(assets, AssetCodeCounter.reserve_codes(year, month, len(assets))):
+            asset.code = code
+
+    assets = Asset.objects.bulk_create([asset for asset, _users in batch])
+    if any(asset.pk is None for asset in assets):
+        ids = dict(Asset.objects.filter(code__in=[a.code for a in assets]).values_list("code", "id"))
+        for asset in assets:
+            asset.pk = ids[asset.code]
+
+    AssetResponsibility.objects.bulk_create(
+        [
+            AssetResponsibility(asset_id=asset.pk, user_id=user_id)
+            for asset, user_ids in batch
+            for user_id in user_ids
+        ]
+    )
+    AssetLocationHistory.objects.bulk_create(
+        [
+            AssetLocationHistory(
+                asset_id=asset.pk,
+                from_location=None,
+                to_location_id=asset.current_location_id,
+                moved_by=user,
+            )
+            for asset in assets
+        ]
+    )
+    # bulk_create skips the post_save receivers that maintain these.
+    search.index_assets(asset.pk for asset in assets)
+    summary.apply_deltas(Counter(summary.summary_key(asset) for asset in assets))
+    return assets
+
+
+def import_assets(records: Iterable[tuple[int, dict]], user, batch_size: int = IMPORT_BATCH_SIZE) -> ImportResult:
+    """Create assets from ``(line, record)`` pairs in batches.
+
+    Invalid rows are skipped and reported. Codes are reserved as one block per
+    (year, month) and batch instead of one locked counter update per asset.
+    Each batch commits on its own, so the counter rows are locked for one
+    batch at a time; if the file turns out unreadable part way through, the
+    batches before that point stay imported.
+    """
+    result = ImportResult()
+    lookups = _Lookups()
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, batch_size))
+        if not chunk:
+            break
+        batch = []
+        for line, record in chunk:
+            try:
+                batch.append(_build(record, lookups, user))
+            except ValueError as exc:
+                result.errors.append((line, str(exc)))
+        if batch:
+            with transaction.atomic():
+                assets = _create_batch(batch, user)
+                DataVersion.bump_on_commit("asset")
+            result.created += len(assets)
+            result.codes.extend(asset.code for asset in assets)
+    return result
+
+
+def records_from_file(fileobj, name: str) -> Iterator[tuple[int, dict]]:
+    """``fileobj`` is opened in binary mode; CSV is decoded as UTF-8 here."""
+    if name.lower().endswith(".xlsx"):
+        return records_from_rows(iter_xlsx_rows(fileobj))
+    return records_from_rows(iter_csv_rows(io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")))
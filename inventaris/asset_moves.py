@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Iterable
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import search, summary
+from .audit_archive import note_written
+from .models import Asset, AssetLocationHistory, AuditLog, DataVersion, Location
+
+
+def move_assets(asset_ids: Iterable[int], to_location: Location, user, note: str = "", moved_at=None) -> int:
+    """Move assets to ``to_location`` in one transaction and one UPDATE.
+
+    Assets already at the destination or soft-deleted are skipped. History and
+    audit rows are bulk inserted; the post_save receivers do not run, so the
+    search index, inventory summary and data version are updated here.
+    """
+    moved_at = moved_at or timezone.now()
+    with transaction.atomic():
+        rows = list(
+            Asset.objects.select_for_update()
+            .filter(pk__in=list(asset_ids), deleted_at__isnull=True)
+            .exclude(current_location=to_location)
+            .order_by("pk")
+            .values("pk", "current_location_id", "category_id", "status", "condition", "deleted_at")
+        )
+        if not rows:
+            return 0
+        ids = [row["pk"] for row in rows]
+        Asset.objects.filter(pk__in=ids).update(
+            current_location=to_location,
+            updated_by=user,
+            updated_at=timezone.now(),
+        )
+        AssetLocationHistory.objects.bulk_create(
+            [
+                AssetLocationHistory(
+                    asset_id=row["pk"],
+                    from_location_id=row["current_location_id"],
+                    to_location=to_location,
+                    moved_by=user,
+                    note=note,
+                    moved_at=moved_at,
+                )
+                for row in rows
+            ],
+            batch_size=500,
+        )
+        entries = AuditLog.objects.bulk_create(
+            [
+                AuditLog(
+                    entity="asset",
+                    entity_id=row["pk"],
+                    action="update",
+                    changes={
+                        "current_location": {
+                            "before": row["current_location_id"],
+                            "after": to_location.pk,
+                        }
+                    },
+                    performed_by=user,
+                    performed_at=moved_at,
+                )
+                for row in rows
+            ],
+            batch_size=500,
+        )
+        deltas: Counter = Counter()
+        for row in rows:
+            deltas[summary.summary_key(row)] -= 1
+            deltas[summary.summary_key({**row, "current_location_id": to_location.pk})] += 1
+        summary.apply_deltas(deltas)
+        search.index_assets(ids)
+        DataVersion.bump_on_commit("asset")
+        transaction.on_commit(lambda: note_written(entries))
+    return len(rows)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from .audit_archive import note_written
+from .models import AuditLog
+
+AUDIT_FLUSH_BATCH_SIZE = 500
+
+_local = threading.local()
+
+
+class AuditBuffer:
+    """Committed audit entries waiting to be written with one bulk_create."""
+
+    def __init__(self):
+        self.entries: list[AuditLog] = []
+
+    def add(self, entry: AuditLog):
+        self.entries.append(entry)
+
+    def flush(self) -> int:
+        entries, self.entries = self.entries, []
+        if entries:
+            AuditLog.objects.bulk_create(entries, batch_size=AUDIT_FLUSH_BATCH_SIZE)
+            note_written(entries)
+        return len(entries)
+
+
+def current_buffer() -> AuditBuffer | None:
+    return getattr(_local, "buffer", None)
+
+
+@contextmanager
+def audit_buffer():
+    """Collect audit entries and write them together when the block ends.
+
+    Nested blocks join the outermost buffer. If the block ends inside a
+    transaction, the flush waits for that transaction to commit. Web requests
+    get one from AuditBufferMiddleware; management commands that write assets
+    decorate ``handle()`` with it.
+    """
+    buffer = current_buffer()
+    if buffer is not None:
+        yield buffer
+        return
+    buffer = AuditBuffer()
+    _local.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        _local.buffer = None
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(buffer.flush)
+        else:
+            buffer.flush()
+
+
+def record(entry: AuditLog):
+    """Queue ``entry`` for when the current transaction commits; dropped on rollback."""
+    buffer = current_buffer()
+    if buffer is None:
+        transaction.on_commit(lambda: _save(entry))
+    else:
+        transaction.on_commit(lambda: buffer.add(entry))
+
+
+def _save(entry: AuditLog):
+    entry.save()
+    note_written([entry])
@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from .models import AuditLog
+from .pagination import KeysetPage, KeysetPaginator, decode_cursor, seek_q
+
+INDEX_NAME = "index.json"
+ARCHIVE_CHUNK_SIZE = 2000
+# Entries per segment file. A month is split into several segments so that a
+# page of archived entries only decompresses a bounded number of rows.
+SEGMENT_MAX_ENTRIES = 1000
+DELETE_BATCH_SIZE = 500
+FILTER_CHOICES_TIMEOUT = 300
+FILTER_CHOICES_KEY = "audit-log-filter-choices"
+AUDIT_ORDERING = ("-performed_at", "-id")
+
+# Filters understood by the archive reader; the same keys the audit view uses.
+FILTER_KEYS = ("entity", "action", "performed_by_id", "entity_id")
+
+
+@dataclass
+class ArchivedAuditEntry:
+    """Read-only stand-in for an AuditLog row that lives in a segment file."""
+
+    id: int
+    entity: str
+    entity_id: int
+    action: str
+    changes: dict
+    performed_by_id: int
+    performed_by: str
+    performed_at: datetime
+    archived: bool = True
+
+    @classmethod
+    def from_json(cls, data: dict) -> ArchivedAuditEntry:
+        return cls(
+            id=data["id"],
+            entity=data["entity"],
+            entity_id=data["entity_id"],
+            action=data["action"],
+            changes=data["changes"],
+            performed_by_id=data["performed_by_id"],
+            performed_by=data["performed_by"],
+            performed_at=parse_datetime(data["performed_at"]),
+        )
+
+
+def archive_dir() -> Path:
+    return Path(settings.AUDIT_ARCHIVE_DIR)
+
+
+def _write_json_atomic(path: Path, data):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "w", encoding="utf-8") as fileobj:
+        json.dump(data, fileobj)
+    os.replace(tmp, path)
+
+
+_index_lock = threading.Lock()
+_index_cache: dict = {"key": None, "segments": []}
+
+
+def load_index(directory: Path | None = None) -> list[dict]:
+    """Segment descriptors, newest first; cached until index.json changes."""
+    path = (directory or archive_dir()) / INDEX_NAME
+    try:
+        key = (str(path), path.stat().st_mtime_ns)
+    except FileNotFoundError:
+        return []
+    with _index_lock:
+        if _index_cache["key"] == key:
+            return _index_cache["segments"]
+    with open(path, encoding="utf-8") as fileobj:
+        segments = json.load(fileobj)["segments"]
+    segments.sort(key=lambda segment: (segment["end"], segment["id_max"]), reverse=True)
+    with _index_lock:
+        _index_cache["key"] = key
+        _index_cache["segments"] = segments
+    return segments
+
+
+def _save_index(directory: Path, segments: list[dict]):
+    _write_json_atomic(directory / INDEX_NAME, {"version": 1, "segments": segments})
+
+
+def _id_ranges(ids: list[int]) -> list[list[int]]:
+    ranges: list[list[int]] = []
+    for pk in sorted(set(ids)):
+        if ranges and pk == ranges[-1][1] + 1:
+            ranges[-1][1] = pk
+        else:
+            ranges.append([pk, pk])
+    return ranges
+
+
+def _in_ranges(pk: int, ranges: list[list[int]]) -> bool:
+    return any(start <= pk <= end for start, end in ranges)
+
+
+def segment_matches(segment: dict, filters: dict) -> int:
+    """Number of entries in ``segment`` matching ``filters`` (upper bound with entity_id)."""
+    if filters.get("entity_id") is not None:
+        if filters.get("entity"):
+            candidates = [segment["entity_ids"].get(filters["entity"], [])]
+        else:
+            candidates = list(segment["entity_ids"].values())
+        if not any(_in_ranges(filters["entity_id"], ranges) for ranges in candidates):
+            return 0
+    return sum(
+        count
+        for entity, action, performed_by_id, count in segment["groups"]
+        if (not filters.get("entity") or entity == filters["entity"])
+        and (not filters.get("action") or action == filters["action"])
+        and (filters.get("performed_by_id") is None or performed_by_id == filters["performed_by_id"])
+    )
+
+
+def _entry_matches(entry: dict, filters: dict) -> bool:
+    return all(
+        filters.get(key) in (None, "") or entry[key] == filters[key] for key in FILTER_KEYS
+    )
+
+
+def _read_segment(directory: Path, segment: dict) -> list[dict]:
+    with gzip.open(directory / segment["file"], "rt", encoding="utf-8") as fileobj:
+        return [json.loads(line) for line in fileobj if line.strip()]
+
+
+def iter_archived(
+    filters: dict | None = None, since: datetime | None = None, directory: Path | None = None
+) -> Iterator[ArchivedAuditEntry]:
+    """Archived entries matching ``filters``, newest first, skipping segments via the index.
+
+    With ``since`` only entries performed after it are returned.
+    """
+    filters = filters or {}
+    directory = directory or archive_dir()
+    for segment in load_index(directory):
+        if since is not None and parse_datetime(segment["end"]) <= since:
+            continue
+        if not segment_matches(segment, filters):
+            continue
+        entries = _read_segment(directory, segment)
+        for data in reversed(entries):
+            if not _entry_matches(data, filters):
+                continue
+            entry = ArchivedAuditEntry.from_json(data)
+            if since is None or entry.performed_at > since:
+                yield entry
+
+
+def archived_count(filters: dict | None = None) -> int:
+    """Matching archived entries, from the index alone (an upper bound with entity_id)."""
+    filters = filters or {}
+    return sum(segment_matches(segment, filters) for segment in load_index())
+
+
+def archived_values(column: str) -> set[str]:
+    """Distinct ``entity`` or ``action`` values present in the archive."""
+    position = {"entity": 0, "action": 1}[column]
+    return {group[position] for segment in load_index() for group in segment["groups"]}
+
+
+def _key(entry) -> tuple:
+    return (entry.performed_at, entry.id)
+
+
+def archived_page(filters: dict, cursor: tuple | None, limit: int, older: bool = True) -> list[ArchivedAuditEntry]:
+    """Up to ``limit`` archived entries older (or newer) than ``cursor``, nearest first.
+
+    ``cursor`` is a (performed_at, id) pair; segments entirely on the wrong
+    side of it are skipped without being read, so a page decompresses at most
+    a few segments of ``SEGMENT_MAX_ENTRIES`` rows however deep it is.
+    """
+    filters = filters or {}
+    directory = archive_dir()
+    segments = load_index(directory)
+    if not older:
+        segments = list(reversed(segments))
+    result: list[ArchivedAuditEntry] = []
+    for segment in segments:
+        if len(result) >= limit:
+            break
+        if not segment_matches(segment, filters):
+            continue
+        if cursor is not None:
+            if older and parse_datetime(segment["start"]) > cursor[0]:
+                continue
+            if not older and parse_datetime(segment["end"]) < cursor[0]:
+                continue
+        entries = _read_segment(directory, segment)
+        for data in reversed(entries) if older else entries:
+            if not _entry_matches(data, filters):
+                continue
+            entry = ArchivedAuditEntry.from_json(data)
+            if cursor is not None and (_key(entry) >= cursor if older else _key(entry) <= cursor):
+                continue
+            result.append(entry)
+            if len(result) >= limit:
+                break
+    return result
+
+
+class AuditKeysetPaginator(KeysetPaginator):
+    """Keyset pages over the AuditLog table that continue into the archive.
+
+    Archived entries are always older than the cutoff, so they follow every
+    row still in the table when ordering newest first.
+    """
+
+    def __init__(self, queryset, per_page: int, filters: dict):
+        super().__init__(queryset, AUDIT_ORDERING, per_page)
+        self.filters = filters
+
+    def page(self, after: str | None = None, before: str | None = None) -> KeysetPage:
+        limit = self.per_page + 1
+        before_values = decode_cursor(before, self.ordering, self.model)
+        if before_values is not None:
+            rows = archived_page(self.filters, tuple(before_values), limit, older=False)
+            if len(rows) < limit:
+                rows += list(
+                    self.queryset.filter(seek_q(self.ordering, before_values, forward=False))
+                    .order_by(*self._reversed())[: limit - len(rows)]
+                )
+            has_previous = len(rows) > self.per_page
+            rows = rows[: self.per_page]
+            rows.reverse()
+            return KeysetPage(rows, True, has_previous, self.ordering, self.model)
+
+        after_values = decode_cursor(after, self.ordering, self.model)
+        qs = self.queryset
+        if after_values is not None:
+            qs = qs.filter(seek_q(self.ordering, after_values))
+        rows = list(qs.order_by(*self.ordering)[:limit])
+        if len(rows) < limit:
+            cursor = _key(rows[-1]) if rows else (tuple(after_values) if after_values else None)
+            rows += archived_page(self.filters, cursor, limit - len(rows))
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[: self.per_page], has_next, after_values is not None, self.ordering, self.model)
+
+
+def filter_choices() -> dict[str, list[str]]:
+    """Distinct entity/action values for the audit filters, table and archive, cached."""
+
+    def compute():
+        return {
+            column: sorted(
+                set(AuditLog.objects.order_by().values_list(column, flat=True).distinct())
+                | archived_values(column)
+            )
+            for column in ("entity", "action")
+        }
+
+    return cache.get_or_set(FILTER_CHOICES_KEY, compute, FILTER_CHOICES_TIMEOUT)
+
+
+def forget_filter_choices():
+    cache.delete(FILTER_CHOICES_KEY)
+
+
+def note_written(entries):
+    """Drop the cached filter choices if ``entries`` bring an entity or action they lack."""
+    choices = cache.get(FILTER_CHOICES_KEY)
+    if choices is None:
+        return
+    entities, actions = set(choices["entity"]), set(choices["action"])
+    if any(entry.entity not in entities or entry.action not in actions for entry in entries):
+        forget_filter_choices()
+
+
+def _entry_json(row) -> dict:
+    return {
+        "id": row.pk,
+        "entity": row.entity,
+        "entity_id": row.entity_id,
+        "action": row.action,
+        "changes": row.changes,
+        "performed_by_id": row.performed_by_id,
+        "performed_by": row.performed_by.get_username(),
+        "performed_at": row.performed_at.isoformat(),
+        "created_at": row.created_at.isoformat(),
+    }
+
+
+class _SegmentWriter:
+    def __init__(self, directory: Path, month: str, first_id: int):
+        self.month = month
+        self.file = f"{month}-{first_id}.jsonl.gz"
+        self.tmp = directory / f".tmp-{self.file}"
+        self.path = directory / self.file
+        self.handle = gzip.open(self.tmp, "wt", encoding="utf-8")
+        self.ids: list[int] = []
+        self.entity_ids: dict[str, list[int]] = {}
+        self.groups: dict[tuple, int] = {}
+        self.start = None
+        self.end = None
+
+    def write(self, row):
+        entry = _entry_json(row)
+        self.handle.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self.ids.append(row.pk)
+        self.entity_ids.setdefault(row.entity, []).append(row.entity_id)
+        key = (row.entity, row.action, row.performed_by_id)
+        self.groups[key] = self.groups.get(key, 0) + 1
+        self.start = self.start or entry["performed_at"]
+        self.end = entry["performed_at"]
+
+    def close(self) -> dict:
+        self.handle.close()
+        os.replace(self.tmp, self.path)
+        return {
+            "file": self.file,
+            "start": self.start,
+            "end": self.end,
+            "count": len(self.ids),
+            "id_min": min(self.ids),
+            "id_max": max(self.ids),
+            "groups": [[*key, count] for key, count in sorted(self.groups.items())],
+            "entity_ids": {entity: _id_ranges(ids) for entity, ids in self.entity_ids.items()},
+            "purged": False,
+        }
+
+
+def _purge(directory: Path, segments: list[dict]) -> int:
+    """Delete archived rows from the table, then mark their segments as purged."""
+    deleted = 0
+    for segment in segments:
+        if segment["purged"]:
+            continue
+        ids = [entry["id"] for entry in _read_segment(directory, segment)]
+        with transaction.atomic():
+            for offset in range(0, len(ids), DELETE_BATCH_SIZE):
+                deleted += AuditLog.objects.filter(pk__in=ids[offset : offset + DELETE_BATCH_SIZE]).delete()[0]
+        segment["purged"] = True
+        _save_index(directory, segments)
+    return deleted
+
+
+def archive_before(cutoff: datetime, directory: Path | None = None) -> tuple[int, int]:
+    """Move entries performed before ``cutoff`` into gzip JSONL segments.
+
+    Segments never span months and hold at most ``SEGMENT_MAX_ENTRIES`` each.
+
+    Segments and the index are written (atomically) before any row is deleted;
+    a run interrupted before the purge finishes the purge on the next run.
+    Returns (archived, deleted).
+    """
+    directory = directory or archive_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    segments = [dict(segment) for segment in load_index(directory)]
+    # Rows of an interrupted run are deleted first, so the query below cannot
+    # archive them a second time.
+    deleted = _purge(directory, segments)
+
+    rows = (
+        AuditLog.objects.filter(performed_at__lt=cutoff)
+        .select_related("performed_by")
+        .order_by("performed_at", "id")
+        .iterator(chunk_size=ARCHIVE_CHUNK_SIZE)
+    )
+    archived = 0
+    writer = None
+    for row in rows:
+        month = row.performed_at.strftime("%Y-%m")
+        if writer is None or writer.month != month or len(writer.ids) >= SEGMENT_MAX_ENTRIES:
+            if writer is not None:
+                segments.append(writer.close())
+            writer = _SegmentWriter(directory, month, row.pk)
+        writer.write(row)
+        archived += 1
+    if writer is not None:
+        segments.append(writer.close())
+    if archived:
+        _save_index(directory, segments)
+        forget_filter_choices()
+    return archived, deleted + _purge(directory, segments)
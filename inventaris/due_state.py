@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from datetime import date
+
+from django.db.models import Exists, F, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import AssetLatestReading, MaintenanceSchedule, ScheduleDueState
+
+STATE_FIELDS = [
+    "asset",
+    "trigger_type",
+    "state",
+    "next_due_date",
+    "current_usage",
+    "next_due_usage",
+    "evaluated_at",
+]
+
+
+def usage_state(current_usage: int | None, next_due_usage: int | None, usage_interval: int | None) -> str:
+    if current_usage is None or next_due_usage is None:
+        return ScheduleDueState.STATE_OK
+    if current_usage > next_due_usage:
+        return ScheduleDueState.STATE_OVERDUE
+    if current_usage == next_due_usage:
+        return ScheduleDueState.STATE_DUE
+    # Warning when remaining usage is in the last 10% interval.
+    if usage_interval and current_usage >= next_due_usage - max(1, int(usage_interval * 0.1)):
+        return ScheduleDueState.STATE_WARNING
+    return ScheduleDueState.STATE_OK
+
+
+def time_state(next_due_date: date | None, today: date) -> str:
+    if next_due_date is None or next_due_date > today:
+        return ScheduleDueState.STATE_OK
+    if next_due_date == today:
+        return ScheduleDueState.STATE_DUE
+    return ScheduleDueState.STATE_OVERDUE
+
+
+def latest_reading_subquery():
+    return Subquery(
+        AssetLatestReading.objects.filter(
+            asset_id=OuterRef("asset_id"),
+            reading_type=OuterRef("usage_reading_type"),
+        ).values("reading_value")[:1]
+    )
+
+
+def build_state(schedule: MaintenanceSchedule, latest_usage: int | None, today: date, now) -> ScheduleDueState:
+    state = ScheduleDueState(
+        schedule_id=schedule.pk,
+        asset_id=schedule.asset_id,
+        trigger_type=schedule.trigger_type,
+        next_due_date=schedule.next_due_date,
+        evaluated_at=now,
+    )
+    if schedule.trigger_type == MaintenanceSchedule.TRIGGER_TIME:
+        state.state = time_state(schedule.next_due_date, today)
+    elif (
+        schedule.trigger_type == MaintenanceSchedule.TRIGGER_USAGE
+        and schedule.usage_reading_type
+        and schedule.next_due_usage is not None
+    ):
+        state.current_usage = latest_usage if latest_usage is not None else schedule.last_usage_value
+        state.next_due_usage = schedule.next_due_usage
+        state.state = usage_state(state.current_usage, schedule.next_due_usage, schedule.usage_interval)
+    return state
+
+
+def refresh_schedules(schedules, today: date | None = None) -> int:
+    """Recompute the due state of ``schedules`` (a queryset) in a few statements."""
+    today = today or date.today()
+    now = timezone.now()
+    rows = schedules.order_by().annotate(latest_usage=latest_reading_subquery())
+    states = [build_state(schedule, schedule.latest_usage, today, now) for schedule in rows]
+    if not states:
+        return 0
+    existing = set(
+        ScheduleDueState.objects.filter(
+            schedule_id__in=[state.schedule_id for state in states]
+        ).values_list("schedule_id", flat=True)
+    )
+    ScheduleDueState.objects.bulk_update(
+        [state for state in states if state.schedule_id in existing], STATE_FIELDS, batch_size=500
+    )
+    ScheduleDueState.objects.bulk_create(
+        [state for state in states if state.schedule_id not in existing], batch_size=500
+    )
+    return len(states)
+
+
+def refresh_for_readings(asset_id: int, reading_type: str) -> int:
+    return refresh_schedules(
+        MaintenanceSchedule.objects.filter(
+            asset_id=asset_id,
+            trigger_type=MaintenanceSchedule.TRIGGER_USAGE,
+            usage_reading_type=reading_type,
+        )
+    )
+
+
+def _usage_overdue_q() -> Q:
+    newer_reading = AssetLatestReading.objects.filter(
+        asset_id=OuterRef("asset_id"),
+        reading_type=OuterRef("usage_reading_type"),
+        reading_value__gt=OuterRef("next_due_usage"),
+    )
+    any_reading = AssetLatestReading.objects.filter(
+        asset_id=OuterRef("asset_id"),
+        reading_type=OuterRef("usage_reading_type"),
+    )
+    return Q(Exists(newer_reading)) | (
+        ~Q(Exists(any_reading)) & Q(last_usage_value__gt=F("next_due_usage"))
+    )
+
+
+def sweep_steps(today: date | None = None):
+    """Set-based status updates as (label, queryset, values) steps.
+
+    Every filter excludes rows that already hold the target value, so each
+    UPDATE only writes rows whose status actually changes.
+    """
+    today = today or date.today()
+    now = timezone.now()
+    schedules = MaintenanceSchedule.objects.order_by()
+    time_schedules = schedules.filter(trigger_type=MaintenanceSchedule.TRIGGER_TIME)
+    usage_schedules = schedules.filter(
+        trigger_type=MaintenanceSchedule.TRIGGER_USAGE,
+        usage_reading_type__isnull=False,
+        next_due_usage__isnull=False,
+    )
+    late = {"status": MaintenanceSchedule.STATUS_TERLAMBAT, "updated_at": now}
+    on_time = {"status": MaintenanceSchedule.STATUS_TEPAT, "updated_at": now}
+    time_states = ScheduleDueState.objects.order_by().filter(
+        trigger_type=MaintenanceSchedule.TRIGGER_TIME
+    )
+    return [
+        (
+            "jadwal waktu terlambat",
+            time_schedules.filter(next_due_date__lt=today).exclude(status=late["status"]),
+            late,
+        ),
+        (
+            "jadwal waktu tepat",
+            time_schedules.filter(Q(next_due_date__gte=today) | Q(next_due_date__isnull=True)).exclude(
+                status=on_time["status"]
+            ),
+            on_time,
+        ),
+        (
+            "jadwal usage terlambat",
+            usage_schedules.filter(_usage_overdue_q()).exclude(status=late["status"]),
+            late,
+        ),
+        (
+            "jadwal usage tepat",
+            usage_schedules.exclude(_usage_overdue_q()).exclude(status=on_time["status"]),
+            on_time,
+        ),
+        (
+            "status jatuh tempo hari ini",
+            time_states.filter(next_due_date=today).exclude(state=ScheduleDueState.STATE_DUE),
+            {"state": ScheduleDueState.STATE_DUE, "evaluated_at": now},
+        ),
+        (
+            "status lewat jatuh tempo",
+            time_states.filter(next_due_date__lt=today).exclude(state=ScheduleDueState.STATE_OVERDUE),
+            {"state": ScheduleDueState.STATE_OVERDUE, "evaluated_at": now},
+        ),
+        (
+            "status aman",
+            time_states.filter(Q(next_due_date__gt=today) | Q(next_due_date__isnull=True)).exclude(
+                state=ScheduleDueState.STATE_OK
+            ),
+            {"state": ScheduleDueState.STATE_OK, "evaluated_at": now},
+        ),
+    ]
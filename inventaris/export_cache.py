@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Callable
+
+from django.conf import settings
+
+from .exports import REPORTS
+from .models import DataVersion
+
+CACHE_SUFFIX = ".bin"
+
+
+def _cache_dir() -> Path:
+    path = Path(settings.EXPORT_CACHE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def cache_key(report_type: str, file_format: str, params) -> str:
+    report = REPORTS[report_type]
+    filters = {key: params.get(key) for key in sorted(report["filters"]) if params.get(key)}
+    versions = DataVersion.current(*report["depends_on"])
+    raw = json.dumps([report_type, file_format, filters, versions], sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get(key: str):
+    path = _cache_dir() / f"{key}{CACHE_SUFFIX}"
+    try:
+        fileobj = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    # The modification time doubles as the LRU clock.
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return fileobj
+
+
+def render(key: str, write: Callable) -> object:
+    """Render through ``write`` and keep the result if it fits the cache limits.
+
+    Returns an open file positioned at the start of the rendered bytes.
+    """
+    spool = tempfile.TemporaryFile()
+    try:
+        write(spool)
+        size = spool.tell()
+        if size <= settings.EXPORT_CACHE_MAX_ENTRY_BYTES:
+            _store(key, spool)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def _store(key: str, spool):
+    directory = _cache_dir()
+    spool.seek(0)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as target:
+            shutil.copyfileobj(spool, target)
+        os.replace(tmp_path, directory / f"{key}{CACHE_SUFFIX}")
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+    evict()
+
+
+def evict(max_bytes: int | None = None):
+    max_bytes = settings.EXPORT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    total = 0
+    for entry in os.scandir(_cache_dir()):
+        if not entry.name.endswith(CACHE_SUFFIX):
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total += stat.st_size
+    entries.sort()
+    for _mtime, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
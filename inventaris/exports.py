@@ -0,0 +1,356 @@
+from __future__ import annotations
+
+import csv
+import json
+import tempfile
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterable, Iterator
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Asset, ExportJob, Location, Maintenance
+from .pdf_report import write_table_pdf
+
+EXPORT_CHUNK_SIZE = 2000
+STREAM_BLOCK_SIZE = 64 * 1024
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_CONTENT_TYPE = "text/csv; charset=utf-8"
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+ASSET_REPORT_HEADER = ["Kode", "Nama", "Kategori", "Lokasi", "Status", "Kondisi"]
+MAINTENANCE_REPORT_HEADER = [
+    "Aset",
+    "Tipe",
+    "Tanggal",
+    "Kondisi Sebelum",
+    "Kondisi Sesudah",
+    "Biaya",
+]
+
+ASSET_REPORT_FIELDS = ["code", "name", "category", "location", "status", "condition"]
+MAINTENANCE_REPORT_FIELDS = [
+    "asset",
+    "type",
+    "performed_at",
+    "condition_before",
+    "condition_after",
+    "cost",
+]
+
+
+def _parse_date(value: str | None) -> date | None:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def asset_report_queryset(params):
+    qs = Asset.objects.filter(deleted_at__isnull=True).select_related(
+        "category", "current_location"
+    )
+    status = params.get("status")
+    category = params.get("category")
+    location = params.get("location")
+    if status:
+        qs = qs.filter(status=status)
+    if category:
+        qs = qs.filter(category_id=category)
+    if location:
+        qs = qs.filter(Location.subtree_q_for(location))
+    return qs
+
+
+def maintenance_report_queryset(params):
+    qs = Maintenance.objects.select_related("asset")
+    date_from = _parse_date(params.get("from"))
+    date_to = _parse_date(params.get("to"))
+    mtype = params.get("type")
+    location = params.get("location")
+    if date_from:
+        qs = qs.filter(performed_at__date__gte=date_from)
+    if date_to:
+        qs = qs.filter(performed_at__date__lte=date_to)
+    if mtype:
+        qs = qs.filter(type=mtype)
+    if location:
+        qs = qs.filter(Location.subtree_q_for(location, "asset__current_location"))
+    return qs.order_by("-performed_at")
+
+
+def asset_report_rows(queryset, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[list]:
+    status_labels = dict(Asset.STATUS_CHOICES)
+    condition_labels = dict(Asset.CONDITION_CHOICES)
+    values = queryset.values_list(
+        "code",
+        "name",
+        "category__code",
+        "category__name",
+        "current_location__name",
+        "status",
+        "condition",
+    )
+    for code, name, category_code, category_name, location, status, condition in values.iterator(
+        chunk_size=chunk_size
+    ):
+        yield [
+            code,
+            name,
+            f"{category_code} - {category_name}",
+            location,
+            status_labels.get(status, status),
+            condition_labels.get(condition, condition),
+        ]
+
+
+def maintenance_report_rows(queryset, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[list]:
+    type_labels = dict(Maintenance.TYPE_CHOICES)
+    condition_labels = dict(Asset.CONDITION_CHOICES)
+    values = queryset.values_list(
+        "asset__code",
+        "asset__name",
+        "type",
+        "performed_at",
+        "condition_before",
+        "condition_after",
+        "cost",
+    )
+    for code, name, mtype, performed_at, before, after, cost in values.iterator(
+        chunk_size=chunk_size
+    ):
+        yield [
+            f"{code} - {name}",
+            type_labels.get(mtype, mtype),
+            performed_at.strftime("%Y-%m-%d %H:%M"),
+            condition_labels.get(before, before),
+            condition_labels.get(after, after),
+            float(cost),
+        ]
+
+
+def write_xlsx(fileobj, title: str, header: list[str], rows: Iterable[list]):
+    """Write rows through openpyxl's write-only sheet so memory stays flat."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=title)
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+    wb.save(fileobj)
+
+
+class _LineBuffer:
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def write(self, value: str):
+        self.lines.append(value)
+
+
+def _blocks(lines: Iterable[str], block_size: int = STREAM_BLOCK_SIZE) -> Iterator[bytes]:
+    # Group small per-row strings into larger blocks to keep the number of
+    # socket writes low without holding more than one block in memory.
+    pending: list[str] = []
+    size = 0
+    for line in lines:
+        pending.append(line)
+        size += len(line)
+        if size >= block_size:
+            yield "".join(pending).encode("utf-8")
+            pending = []
+            size = 0
+    if pending:
+        yield "".join(pending).encode("utf-8")
+
+
+def stream_csv(header: list[str], rows: Iterable[list]) -> Iterator[bytes]:
+    buffer = _LineBuffer()
+    writer = csv.writer(buffer)
+
+    def lines():
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            yield from buffer.lines
+            buffer.lines.clear()
+        yield from buffer.lines
+
+    return _blocks(lines())
+
+
+def stream_ndjson(fields: list[str], rows: Iterable[list]) -> Iterator[bytes]:
+    encoder = json.JSONEncoder(ensure_ascii=False)
+
+    def lines():
+        for row in rows:
+            yield encoder.encode(dict(zip(fields, row))) + "\n"
+
+    return _blocks(lines())
+
+
+def _write_stream(fileobj, blocks: Iterable[bytes]):
+    for block in blocks:
+        fileobj.write(block)
+
+
+REPORTS = {
+    ExportJob.REPORT_ASSET: {
+        "title": "Laporan Aset",
+        "sheet": "Aset",
+        "filename": "laporan_aset",
+        "header": ASSET_REPORT_HEADER,
+        "fields": ASSET_REPORT_FIELDS,
+        "filters": ("status", "category", "location"),
+        # Rows include category and location names, so renaming those must
+        # also invalidate cached renders of this report.
+        "depends_on": ("asset", "category", "location"),
+        "queryset": asset_report_queryset,
+        "rows": asset_report_rows,
+        "pdf_widths": [75, 190, 150, 150, 90, 90],
+    },
+    ExportJob.REPORT_MAINTENANCE: {
+        "title": "Laporan Pemeliharaan",
+        "sheet": "Pemeliharaan",
+        "filename": "laporan_pemeliharaan",
+        "header": MAINTENANCE_REPORT_HEADER,
+        "fields": MAINTENANCE_REPORT_FIELDS,
+        "filters": ("from", "to", "type", "location"),
+        "depends_on": ("maintenance", "asset", "location"),
+        "queryset": maintenance_report_queryset,
+        "rows": maintenance_report_rows,
+        "pdf_widths": [250, 80, 100, 110, 110, 90],
+    },
+}
+
+FORMAT_EXTENSIONS = {
+    ExportJob.FORMAT_XLSX: "xlsx",
+    ExportJob.FORMAT_PDF: "pdf",
+    ExportJob.FORMAT_CSV: "csv",
+    ExportJob.FORMAT_NDJSON: "ndjson",
+}
+
+
+def _counted(rows: Iterable[list], progress: Callable[[int], None], every: int) -> Iterator[list]:
+    count = 0
+    for row in rows:
+        yield row
+        count += 1
+        if count % every == 0:
+            progress(count)
+    progress(count)
+
+
+def render_report(
+    report_type: str,
+    file_format: str,
+    params,
+    fileobj,
+    progress: Callable[[int], None] | None = None,
+    progress_every: int = EXPORT_CHUNK_SIZE,
+    pdf_workers: int | None = 1,
+):
+    report = REPORTS[report_type]
+    rows = report["rows"](report["queryset"](params))
+    if progress is not None:
+        rows = _counted(rows, progress, progress_every)
+    if file_format == ExportJob.FORMAT_XLSX:
+        write_xlsx(fileobj, report["sheet"], report["header"], rows)
+    elif file_format == ExportJob.FORMAT_PDF:
+        write_table_pdf(
+            fileobj,
+            report["title"],
+            report["header"],
+            report["pdf_widths"],
+            rows,
+            workers=pdf_workers,
+        )
+    elif file_format == ExportJob.FORMAT_CSV:
+        _write_stream(fileobj, stream_csv(report["header"], rows))
+    elif file_format == ExportJob.FORMAT_NDJSON:
+        _write_stream(fileobj, stream_ndjson(report["fields"], rows))
+    else:
+        raise ValueError(f"Format export tidak dikenal: {file_format}")
+
+
+def export_filename(report_type: str, file_format: str) -> str:
+    return f"{REPORTS[report_type]['filename']}.{FORMAT_EXTENSIONS[file_format]}"
+
+
+def _claimable(now: datetime) -> Q:
+    # A running job reports progress every EXPORT_CHUNK_SIZE rows, which bumps
+    # updated_at; one that has been silent this long lost its worker.
+    stale_before = now - timedelta(seconds=settings.EXPORT_JOB_STALE_AFTER)
+    return Q(status=ExportJob.STATUS_PENDING) | Q(
+        status=ExportJob.STATUS_RUNNING, updated_at__lt=stale_before
+    )
+
+
+def claim_next_export_job() -> ExportJob | None:
+    # A conditional UPDATE is used as the claim so that several workers can
+    # poll the same table without needing row locks.
+    now = timezone.now()
+    claimable = _claimable(now)
+    pending = ExportJob.objects.filter(claimable).order_by("created_at", "id")
+    for job_id in pending.values_list("id", flat=True)[:10]:
+        claimed = ExportJob.objects.filter(claimable, pk=job_id).update(
+            status=ExportJob.STATUS_RUNNING,
+            started_at=now,
+            updated_at=now,
+        )
+        if claimed:
+            return ExportJob.objects.get(pk=job_id)
+    return None
+
+
+def process_export_job(job: ExportJob):
+    report = REPORTS[job.report_type]
+    total = report["queryset"](job.params).count()
+    ExportJob.objects.filter(pk=job.pk).update(rows_total=total, rows_processed=0)
+
+    def progress(count: int):
+        ExportJob.objects.filter(pk=job.pk).update(rows_processed=count, updated_at=timezone.now())
+
+    try:
+        with tempfile.TemporaryFile() as spool:
+            render_report(
+                job.report_type,
+                job.file_format,
+                job.params,
+                spool,
+                progress=progress,
+                pdf_workers=settings.REPORT_PDF_WORKERS,
+            )
+            spool.seek(0)
+            job.file.save(export_filename(job.report_type, job.file_format), File(spool), save=False)
+    except Exception as exc:
+        job.status = ExportJob.STATUS_FAILED
+        job.error = str(exc)
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+        raise
+    finished_at = timezone.now()
+    job.refresh_from_db(fields=["rows_total", "rows_processed"])
+    job.status = ExportJob.STATUS_DONE
+    job.finished_at = finished_at
+    job.expires_at = finished_at + timedelta(seconds=settings.EXPORT_JOB_TTL)
+    job.save(update_fields=["file", "status", "finished_at", "expires_at", "updated_at"])
+
+
+def expire_export_jobs(now: datetime | None = None) -> int:
+    now = now or timezone.now()
+    expired = ExportJob.objects.filter(status=ExportJob.STATUS_DONE, expires_at__lte=now)
+    count = 0
+    for job in expired.iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.status = ExportJob.STATUS_EXPIRED
+        job.save(update_fields=["file", "status", "updated_at"])
+        count += 1
+    return count
@@ -57,6 +57,16 @@ class LocationForm(BootstrapModelForm):
         model = Location
         fields = ["name", "parent", "is_active"]
 
+    def clean_parent(self):
+        parent = self.cleaned_data.get("parent")
+        location = self.instance
+        if parent and location.pk and (
+            parent.pk == location.pk
+            or Location.objects.filter(pk=parent.pk).filter(location.descendants_q()).exists()
+        ):
+            raise forms.ValidationError("Lokasi tidak dapat dipindahkan ke dalam turunannya sendiri.")
+        return parent
+
 
 class AssetForm(BootstrapModelForm):
     class Meta:
@@ -91,6 +101,20 @@ class AssetMeterReadingForm(BootstrapModelForm):
         }
 
 
+class AssetImportForm(BootstrapFormMixin, forms.Form):
+    file = forms.FileField(
+        label="File aset",
+        help_text="XLSX atau CSV dengan kolom nama, kategori, tanggal_perolehan, lokasi, serta opsional status, kondisi, penanggung_jawab (username dipisah koma).",
+    )
+
+
+class MeterReadingImportForm(BootstrapFormMixin, forms.Form):
+    file = forms.FileField(
+        label="File reading",
+        help_text="CSV dengan kolom code, reading_type, reading_value, reading_at (ISO 8601), note; atau JSON/NDJSON dengan field yang sama.",
+    )
+
+
 class MaintenanceScheduleForm(BootstrapModelForm):
     class Meta:
         model = MaintenanceSchedule
@@ -220,6 +244,28 @@ class AssetMoveForm(BootstrapModelForm):
         }
 
 
+class AssetBulkMoveForm(BootstrapFormMixin, forms.Form):
+    assets = forms.ModelMultipleChoiceField(
+        queryset=Asset.objects.filter(deleted_at__isnull=True),
+        widget=forms.MultipleHiddenInput,
+    )
+    to_location = forms.ModelChoiceField(
+        queryset=Location.objects.filter(is_active=True),
+        label="Lokasi Tujuan",
+    )
+    moved_at = forms.DateTimeField(
+        label="Tanggal Mutasi",
+        widget=forms.DateTimeInput(attrs={"type": "datetime-local"}),
+    )
+    note = forms.CharField(label="Catatan", widget=forms.Textarea(attrs={"rows": 3}))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.errors.get("assets"):
+            raise forms.ValidationError("Pilih minimal satu aset yang masih aktif.")
+        return cleaned_data
+
+
 class AssetDeleteForm(BootstrapModelForm):
     class Meta:
         model = AssetDeletion
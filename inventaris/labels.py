@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Callable, Iterator
+
+from .models import Asset, Location
+from .qr import qr_payload
+
+LABEL_CHUNK_SIZE = 2000
+
+
+def label_sheet_queryset(location_id=None, category_id=None):
+    qs = Asset.objects.filter(deleted_at__isnull=True)
+    if location_id:
+        location = Location.objects.get(pk=location_id)
+        qs = qs.filter(location.subtree_q())
+    if category_id:
+        qs = qs.filter(category_id=category_id)
+    return qs.order_by("code", "id")
+
+
+def label_items(queryset, scan_url: Callable[[int], str]) -> Iterator[tuple]:
+    values = queryset.values_list("pk", "code", "name", "current_location__name")
+    for pk, code, name, location in values.iterator(chunk_size=LABEL_CHUNK_SIZE):
+        yield code, name, location, qr_payload(code, name, scan_url(pk))
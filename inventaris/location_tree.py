@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.db.models import Count
+
+from .models import Asset, DataVersion, Location
+
+
+def _path_ids(path: str) -> list[int]:
+    return [int(part) for part in path.split("/") if part]
+
+
+@dataclass
+class LocationNode:
+    pk: int
+    name: str
+    parent_id: int | None
+    path: str
+    level: int
+    is_active: bool
+    parent: LocationNode | None = None
+    children: list[LocationNode] = field(default_factory=list)
+    own_counts: Counter = field(default_factory=Counter)
+    counts: Counter = field(default_factory=Counter)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def status_counts(self) -> list[tuple[str, str, int]]:
+        return [(value, label, self.counts.get(value, 0)) for value, label in Asset.STATUS_CHOICES]
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class LocationTree:
+    def __init__(self, nodes: list[LocationNode]):
+        self.nodes = {node.pk: node for node in nodes}
+        self.ordered = sorted(nodes, key=lambda node: _path_ids(node.path))
+        for node in self.ordered:
+            parent = self.nodes.get(node.parent_id)
+            if parent is not None:
+                node.parent = parent
+                parent.children.append(node)
+        self.roots = [node for node in self.ordered if node.parent is None]
+
+    def get(self, pk: int) -> LocationNode | None:
+        return self.nodes.get(pk)
+
+    def children(self, pk: int) -> list[LocationNode]:
+        node = self.nodes.get(pk)
+        return node.children if node else []
+
+    def ancestors(self, pk: int) -> list[LocationNode]:
+        """Root first, excluding the node itself."""
+        node = self.nodes.get(pk)
+        if node is None:
+            return []
+        return [self.nodes[pk] for pk in _path_ids(node.path)[:-1] if pk in self.nodes]
+
+    def counts(self, pk: int) -> Counter:
+        node = self.nodes.get(pk)
+        return node.counts if node else Counter()
+
+
+def build_location_tree() -> LocationTree:
+    nodes = [
+        LocationNode(pk=pk, name=name, parent_id=parent_id, path=path, level=level, is_active=is_active)
+        for pk, name, parent_id, path, level, is_active in Location.objects.order_by().values_list(
+            "pk", "name", "parent_id", "path", "level", "is_active"
+        )
+    ]
+    tree = LocationTree(nodes)
+
+    grouped = (
+        Asset.objects.filter(deleted_at__isnull=True)
+        .order_by()
+        .values_list("current_location_id", "status")
+        .annotate(total=Count("id"))
+    )
+    for location_id, status, total in grouped:
+        node = tree.nodes.get(location_id)
+        if node is None:
+            continue
+        node.own_counts[status] += total
+        # Walk the materialized path so each count reaches every ancestor.
+        for pk in _path_ids(node.path) or [node.pk]:
+            ancestor = tree.nodes.get(pk)
+            if ancestor is not None:
+                ancestor.counts[status] += total
+    return tree
+
+
+_lock = threading.Lock()
+_cached: dict = {"versions": None, "tree": None}
+
+
+def get_location_tree() -> LocationTree:
+    """Process-wide tree, rebuilt when locations or assets change."""
+    versions = DataVersion.current("location", "asset")
+    with _lock:
+        if _cached["versions"] == versions and _cached["tree"] is not None:
+            return _cached["tree"]
+    tree = build_location_tree()
+    with _lock:
+        _cached["versions"] = versions
+        _cached["tree"] = tree
+    return tree
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime, time as dt_time, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from inventaris.audit_archive import archive_before, archive_dir
+from inventaris.models import AuditLog
+
+
+class Command(BaseCommand):
+    help = "Move old audit log entries into compressed monthly archive segments"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--before", help="Archive entries performed before this date (YYYY-MM-DD)")
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.AUDIT_RETENTION_DAYS,
+            help="Keep this many days in the table when --before is not given",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only count the entries to archive")
+
+    def handle(self, *args, **options):
+        if options["before"]:
+            try:
+                day = datetime.strptime(options["before"], "%Y-%m-%d").date()
+            except ValueError as exc:
+                raise CommandError("Format tanggal harus YYYY-MM-DD.") from exc
+            cutoff = timezone.make_aware(datetime.combine(day, dt_time.min))
+        else:
+            cutoff = timezone.now() - timedelta(days=options["days"])
+        if options["dry_run"]:
+            count = AuditLog.objects.filter(performed_at__lt=cutoff).count()
+            self.stdout.write(f"{count} entri audit sebelum {cutoff:%Y-%m-%d %H:%M} akan diarsipkan.")
+            return
+        started = time.monotonic()
+        archived, deleted = archive_before(cutoff)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{archived} entri audit diarsipkan ke {archive_dir()}, {deleted} dihapus dari tabel "
+                f"({time.monotonic() - started:.2f} detik)."
+            )
+        )
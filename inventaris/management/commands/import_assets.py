@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from inventaris.asset_import import IMPORT_BATCH_SIZE, import_assets, records_from_file
+from inventaris.audit import audit_buffer
+
+
+class Command(BaseCommand):
+    help = "Bulk import assets from an XLSX or CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import")
+        parser.add_argument("--user", required=True, help="Username recorded as the creator")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+
+    @audit_buffer()
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options["user"])
+        except get_user_model().DoesNotExist as exc:
+            raise CommandError(f"User {options['user']} tidak ditemukan.") from exc
+        started = time.monotonic()
+        with open(options["path"], "rb") as fileobj:
+            try:
+                result = import_assets(
+                    records_from_file(fileobj, options["path"]),
+                    user=user,
+                    batch_size=options["batch_size"],
+                )
+            except ValueError as exc:
+                raise CommandError(str(exc)) from exc
+        for line, message in result.errors[:50]:
+            self.stderr.write(f"Baris {line}: {message}")
+        if len(result.errors) > 50:
+            self.stderr.write(f"... dan {len(result.errors) - 50} error lainnya.")
+        codes = f" ({result.codes[0]} s.d. {result.codes[-1]})" if result.codes else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result.created} aset dibuat{codes}, {len(result.errors)} error "
+                f"({time.monotonic() - started:.2f} detik)."
+            )
+        )
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from inventaris.meters import INGEST_BATCH_SIZE, ingest_readings, records_from_file
+
+
+class Command(BaseCommand):
+    help = "Bulk import asset meter readings from a CSV, JSON or NDJSON telemetry file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import")
+        parser.add_argument("--user", required=True, help="Username recorded as the reader")
+        parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options["user"])
+        except get_user_model().DoesNotExist as exc:
+            raise CommandError(f"User {options['user']} tidak ditemukan.") from exc
+        started = time.monotonic()
+        with open(options["path"], encoding="utf-8-sig", newline="") as fileobj:
+            try:
+                result = ingest_readings(
+                    records_from_file(fileobj, options["path"]),
+                    recorded_by=user,
+                    batch_size=options["batch_size"],
+                )
+            except ValueError as exc:
+                raise CommandError(str(exc)) from exc
+        for line, message in result.errors[:50]:
+            self.stderr.write(f"Baris {line}: {message}")
+        if len(result.errors) > 50:
+            self.stderr.write(f"... dan {len(result.errors) - 50} error lainnya.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result.created} reading diimpor, {result.duplicates} duplikat dilewati, "
+                f"{len(result.errors)} error ({time.monotonic() - started:.2f} detik)."
+            )
+        )
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import csv
+import sys
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventaris.models import Asset, Location
+from inventaris.timetravel import inventory_state_at
+
+
+class Command(BaseCommand):
+    help = "Write the reconstructed state of every asset at a past date as CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument("date", help="Date to reconstruct (YYYY-MM-DD), as of the end of that day")
+        parser.add_argument("--output", help="CSV file to write, default stdout")
+        parser.add_argument("--include-deleted", action="store_true")
+
+    def handle(self, *args, **options):
+        try:
+            day = datetime.strptime(options["date"], "%Y-%m-%d").date()
+        except ValueError as exc:
+            raise CommandError("Format tanggal harus YYYY-MM-DD.") from exc
+        states = inventory_state_at(day, include_deleted=options["include_deleted"])
+        codes = dict(Asset.objects.filter(pk__in=list(states)).values_list("pk", "code"))
+        locations = dict(Location.objects.values_list("pk", "name"))
+        fileobj = open(options["output"], "w", newline="", encoding="utf-8") if options["output"] else sys.stdout
+        try:
+            writer = csv.writer(fileobj)
+            writer.writerow(["code", "status", "condition", "location", "responsible_user_ids", "deleted"])
+            for pk in sorted(states, key=lambda pk: codes.get(pk, "")):
+                state = states[pk]
+                writer.writerow(
+                    [
+                        codes.get(pk, pk),
+                        state.status,
+                        state.condition,
+                        locations.get(state.location_id, ""),
+                        " ".join(str(user_id) for user_id in state.responsible_user_ids),
+                        "ya" if state.deleted else "",
+                    ]
+                )
+        finally:
+            if fileobj is not sys.stdout:
+                fileobj.close()
+        if options["output"]:
+            self.stdout.write(self.style.SUCCESS(f"{len(states)} aset ditulis ke {options['output']}."))
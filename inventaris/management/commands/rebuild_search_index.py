@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from inventaris import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the asset search index from the asset table"
+
+    def handle(self, *args, **options):
+        if search.backend() is None:
+            self.stdout.write("Indeks pencarian tidak tersedia di database ini; pencarian memakai icontains.")
+            return
+        with transaction.atomic():
+            search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS("Indeks pencarian aset dibangun ulang."))
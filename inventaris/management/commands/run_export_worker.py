@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventaris.exports import claim_next_export_job, expire_export_jobs, process_export_job
+
+
+class Command(BaseCommand):
+    help = "Process queued report export jobs outside the web request"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Process the queue once and exit")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Seconds between polls")
+        parser.add_argument("--max-jobs", type=int, default=0, help="Exit after this many jobs")
+
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            expired = expire_export_jobs()
+            if expired:
+                self.stdout.write(f"{expired} file export kedaluwarsa dihapus.")
+            job = claim_next_export_job()
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+                continue
+            started = time.monotonic()
+            try:
+                process_export_job(job)
+            except Exception as exc:
+                self.stderr.write(self.style.ERROR(f"Export #{job.pk} gagal: {exc}"))
+            else:
+                elapsed = time.monotonic() - started
+                self.stdout.write(self.style.SUCCESS(f"Export #{job.pk} selesai dalam {elapsed:.1f} detik."))
+            processed += 1
+            if options["max_jobs"] and processed >= options["max_jobs"]:
+                break
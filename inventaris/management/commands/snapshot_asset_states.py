@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventaris.timetravel import take_checkpoints
+
+
+class Command(BaseCommand):
+    help = "Store a checkpoint of every asset's state to bound point-in-time reconstruction"
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = take_checkpoints()
+        self.stdout.write(
+            self.style.SUCCESS(f"{count} checkpoint aset disimpan ({time.monotonic() - started:.2f} detik).")
+        )
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from inventaris.due_state import sweep_steps
+
+
+class Command(BaseCommand):
+    help = "Recompute maintenance schedule status with set-based updates (run nightly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Evaluate as of this date (YYYY-MM-DD), default today")
+
+    def handle(self, *args, **options):
+        today = None
+        if options["date"]:
+            try:
+                today = datetime.strptime(options["date"], "%Y-%m-%d").date()
+            except ValueError as exc:
+                raise CommandError("Format tanggal harus YYYY-MM-DD.") from exc
+        started = time.monotonic()
+        total = 0
+        with transaction.atomic():
+            for label, queryset, values in sweep_steps(today):
+                step_started = time.monotonic()
+                changed = queryset.update(**values)
+                total += changed
+                self.stdout.write(
+                    f"{label}: {changed} baris diubah ({time.monotonic() - step_started:.3f} detik)"
+                )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Sweep status jadwal selesai: {total} baris diubah dalam {time.monotonic() - started:.3f} detik."
+            )
+        )
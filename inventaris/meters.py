@@ -0,0 +1,366 @@
+from __future__ import annotations
+
+import csv
+import itertools
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, Iterator
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .due_state import refresh_schedules
+from .models import Asset, AssetLatestReading, AssetMeterReading, MaintenanceSchedule
+
+READING_TYPES = {value for value, _label in AssetMeterReading.TYPE_CHOICES}
+
+
+def _newer_than(reading: AssetMeterReading) -> Q:
+    return Q(reading_at__lt=reading.reading_at) | Q(
+        reading_at=reading.reading_at, reading_id__lt=reading.pk
+    )
+
+
+def record_reading(reading: AssetMeterReading):
+    """Promote a newly inserted reading to latest unless a newer one exists.
+
+    Back-dated readings leave the latest row untouched.
+    """
+    current = AssetLatestReading.objects.filter(
+        asset_id=reading.asset_id, reading_type=reading.reading_type
+    )
+    updated = current.filter(_newer_than(reading)).update(
+        reading=reading,
+        reading_value=reading.reading_value,
+        reading_at=reading.reading_at,
+    )
+    if not updated and not current.exists():
+        AssetLatestReading.objects.create(
+            asset_id=reading.asset_id,
+            reading_type=reading.reading_type,
+            reading=reading,
+            reading_value=reading.reading_value,
+            reading_at=reading.reading_at,
+        )
+
+
+def recompute_latest(asset_id: int, reading_type: str):
+    """Re-derive the latest row from history (edits and deletes)."""
+    newest = (
+        AssetMeterReading.objects.filter(asset_id=asset_id, reading_type=reading_type)
+        .order_by("-reading_at", "-id")
+        .only("id", "reading_value", "reading_at")
+        .first()
+    )
+    if newest is None:
+        AssetLatestReading.objects.filter(asset_id=asset_id, reading_type=reading_type).delete()
+        return
+    AssetLatestReading.objects.update_or_create(
+        asset_id=asset_id,
+        reading_type=reading_type,
+        defaults={
+            "reading": newest,
+            "reading_value": newest.reading_value,
+            "reading_at": newest.reading_at,
+        },
+    )
+
+
+def latest_value(asset_id: int, reading_type: str | None) -> int | None:
+    if not reading_type:
+        return None
+    return (
+        AssetLatestReading.objects.filter(asset_id=asset_id, reading_type=reading_type)
+        .values_list("reading_value", flat=True)
+        .first()
+    )
+
+
+INGEST_BATCH_SIZE = 1000
+JSON_READ_SIZE = 64 * 1024
+
+
+@dataclass
+class IngestResult:
+    created: int = 0
+    duplicates: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+    affected: set[tuple[int, str]] = field(default_factory=set)
+
+    def as_dict(self, max_errors: int = 100) -> dict:
+        return {
+            "created": self.created,
+            "duplicates": self.duplicates,
+            "error_count": len(self.errors),
+            "errors": [{"line": line, "error": message} for line, message in self.errors[:max_errors]],
+        }
+
+
+def iter_csv_records(fileobj) -> Iterator[tuple[int, dict]]:
+    """Rows of a CSV with a header naming (at least) code, reading_type, reading_value, reading_at."""
+    reader = csv.DictReader(fileobj)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _iter_json_array(fileobj, read_size: int = JSON_READ_SIZE) -> Iterator[object]:
+    """Items of a JSON array whose opening "[" was already read, decoded one at a time.
+
+    Only the item being decoded (plus one read) is held in memory. A broken
+    array cannot be resynchronised, so it raises ValueError for the whole file.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+    expect_item = True
+    index = 0
+    while True:
+        buffer = buffer.lstrip()
+        if not buffer:
+            if eof:
+                raise ValueError("Array JSON tidak ditutup dengan ']'.")
+            buffer = fileobj.read(read_size)
+            eof = not buffer
+            continue
+        if buffer[0] == "]" and (index == 0 or not expect_item):
+            return
+        if not expect_item:
+            if buffer[0] != ",":
+                raise ValueError(f"JSON tidak valid setelah item ke-{index}.")
+            buffer = buffer[1:]
+            expect_item = True
+            continue
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except ValueError:
+            end = None
+        # A decode that fails or stops at the end of the buffer may only be
+        # missing the rest of the item; read more before deciding.
+        if (end is None or end == len(buffer)) and not eof:
+            chunk = fileobj.read(read_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+        if end is None:
+            raise ValueError(f"JSON tidak valid pada item ke-{index + 1}.")
+        index += 1
+        buffer = buffer[end:]
+        expect_item = False
+        yield item
+
+
+def iter_json_records(fileobj) -> Iterator[tuple[int, dict]]:
+    """A JSON array of objects, or one object per line (NDJSON); both are streamed."""
+    first = fileobj.read(1)
+    while first and first.isspace():
+        first = fileobj.read(1)
+    if first == "[":
+        yield from enumerate(_iter_json_array(fileobj), start=1)
+        return
+    for line_no, line in enumerate(itertools.chain([first + fileobj.readline()], fileobj), start=1):
+        if line.strip():
+            try:
+                yield line_no, json.loads(line)
+            except ValueError:
+                yield line_no, None
+
+
+def _parse_record(record) -> tuple[str, str, int, datetime, str]:
+    if not isinstance(record, dict):
+        raise ValueError("Baris bukan objek yang valid.")
+    code = str(record.get("code") or "").strip()
+    if not code:
+        raise ValueError("Kode aset kosong.")
+    reading_type = str(record.get("reading_type") or "").strip().upper()
+    if reading_type not in READING_TYPES:
+        raise ValueError(f"Tipe reading tidak dikenal: {reading_type or '-'}.")
+    try:
+        value = int(record.get("reading_value"))
+    except (TypeError, ValueError):
+        raise ValueError("Nilai reading harus bilangan bulat.") from None
+    if value < 0:
+        raise ValueError("Nilai reading tidak boleh negatif.")
+    reading_at = parse_datetime(str(record.get("reading_at") or "").strip())
+    if reading_at is None:
+        raise ValueError("Waktu reading tidak valid (gunakan ISO 8601).")
+    if timezone.is_naive(reading_at):
+        reading_at = timezone.make_aware(reading_at)
+    return code, reading_type, value, reading_at, str(record.get("note") or "")
+
+
+class _Ingestor:
+    def __init__(self, recorded_by, batch_size: int):
+        self.recorded_by = recorded_by
+        self.batch_size = batch_size
+        self.result = IngestResult()
+        self.asset_ids: dict[str, int | None] = {}
+        # (asset_id, reading_type) -> (reading_at, value) of the newest reading
+        # known so far, from the database or earlier in the file.
+        self.newest: dict[tuple[int, str], tuple[datetime, int]] = {}
+        self.seen: set[tuple[int, str, datetime]] = set()
+        self.pending: list[tuple[int, AssetMeterReading]] = []
+
+    def run(self, records: Iterable[tuple[int, dict]]):
+        for batch in _batches(records, self.batch_size):
+            self._process(batch)
+        self._flush()
+
+    def _process(self, batch: list[tuple[int, dict]]):
+        parsed = []
+        for line, record in batch:
+            try:
+                parsed.append((line, _parse_record(record)))
+            except ValueError as exc:
+                self.result.errors.append((line, str(exc)))
+        self._resolve_codes({code for _, (code, *_rest) in parsed})
+        rows = []
+        for line, (code, reading_type, value, reading_at, note) in parsed:
+            asset_id = self.asset_ids.get(code)
+            if asset_id is None:
+                self.result.errors.append((line, f"Aset dengan kode {code} tidak ditemukan."))
+                continue
+            rows.append((line, asset_id, reading_type, value, reading_at, note))
+        self._load_state(rows)
+        for line, asset_id, reading_type, value, reading_at, note in rows:
+            self._add(line, asset_id, reading_type, value, reading_at, note)
+        if len(self.pending) >= self.batch_size:
+            self._flush()
+
+    def _resolve_codes(self, codes: set[str]):
+        missing = [code for code in codes if code not in self.asset_ids]
+        if not missing:
+            return
+        self.asset_ids.update(
+            Asset.objects.filter(code__in=missing, deleted_at__isnull=True).values_list("code", "id")
+        )
+        for code in missing:
+            self.asset_ids.setdefault(code, None)
+
+    def _load_state(self, rows: list[tuple]):
+        pairs = {(asset_id, reading_type) for _, asset_id, reading_type, *_rest in rows}
+        unknown = pairs - self.newest.keys()
+        if unknown:
+            for asset_id, reading_type, reading_at, value in AssetLatestReading.objects.filter(
+                asset_id__in={asset_id for asset_id, _ in unknown}
+            ).values_list("asset_id", "reading_type", "reading_at", "reading_value"):
+                if (asset_id, reading_type) in unknown:
+                    self.newest[(asset_id, reading_type)] = (reading_at, value)
+        keys = {(asset_id, reading_type, reading_at) for _, asset_id, reading_type, _v, reading_at, _n in rows}
+        existing = AssetMeterReading.objects.filter(
+            asset_id__in={key[0] for key in keys},
+            reading_at__in={key[2] for key in keys},
+        ).values_list("asset_id", "reading_type", "reading_at")
+        self.seen.update(key for key in existing if key in keys)
+
+    def _add(self, line: int, asset_id: int, reading_type: str, value: int, reading_at: datetime, note: str):
+        key = (asset_id, reading_type, reading_at)
+        if key in self.seen:
+            self.result.duplicates += 1
+            return
+        newest = self.newest.get((asset_id, reading_type))
+        if newest is None or reading_at > newest[0]:
+            if newest is not None and value < newest[1]:
+                self.result.errors.append(
+                    (line, f"Nilai {value} lebih kecil dari reading sebelumnya ({newest[1]}).")
+                )
+                return
+            self.newest[(asset_id, reading_type)] = (reading_at, value)
+        else:
+            # Back-dated: it must fit between its neighbours in history.
+            self._flush()
+            error = _neighbour_error(asset_id, reading_type, value, reading_at)
+            if error:
+                self.result.errors.append((line, error))
+                return
+        self.seen.add(key)
+        self.pending.append(
+            (
+                line,
+                AssetMeterReading(
+                    asset_id=asset_id,
+                    reading_type=reading_type,
+                    reading_value=value,
+                    reading_at=reading_at,
+                    note=note,
+                    recorded_by=self.recorded_by,
+                ),
+            )
+        )
+        self.result.affected.add((asset_id, reading_type))
+
+    def _flush(self):
+        if not self.pending:
+            return
+        AssetMeterReading.objects.bulk_create(
+            [reading for _, reading in self.pending], batch_size=self.batch_size
+        )
+        self.result.created += len(self.pending)
+        self.pending = []
+
+
+def _batches(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _neighbour_error(asset_id: int, reading_type: str, value: int, reading_at: datetime) -> str | None:
+    history = AssetMeterReading.objects.filter(asset_id=asset_id, reading_type=reading_type)
+    before = (
+        history.filter(reading_at__lt=reading_at)
+        .order_by("-reading_at", "-id")
+        .values_list("reading_value", flat=True)
+        .first()
+    )
+    if before is not None and value < before:
+        return f"Nilai {value} lebih kecil dari reading sebelumnya ({before})."
+    after = (
+        history.filter(reading_at__gt=reading_at)
+        .order_by("reading_at", "id")
+        .values_list("reading_value", flat=True)
+        .first()
+    )
+    if after is not None and value > after:
+        return f"Nilai {value} lebih besar dari reading sesudahnya ({after})."
+    return None
+
+
+def records_from_file(fileobj, name: str) -> Iterator[tuple[int, dict]]:
+    if name.lower().endswith((".json", ".ndjson", ".jsonl")):
+        return iter_json_records(fileobj)
+    return iter_csv_records(fileobj)
+
+
+def ingest_readings(
+    records: Iterable[tuple[int, dict]],
+    recorded_by,
+    batch_size: int = INGEST_BATCH_SIZE,
+) -> IngestResult:
+    """Validate and bulk insert ``(line, record)`` pairs.
+
+    Rows with errors are skipped and reported; the rest are inserted with
+    ``bulk_create``, which bypasses signals, so the latest-reading rows and
+    due states of the affected (asset, reading type) pairs are refreshed once
+    at the end instead of per reading.
+    """
+    ingestor = _Ingestor(recorded_by, batch_size)
+    with transaction.atomic():
+        ingestor.run(records)
+        result = ingestor.result
+        result.errors.sort()
+        for asset_id, reading_type in result.affected:
+            recompute_latest(asset_id, reading_type)
+        if result.affected:
+            refresh_schedules(
+                MaintenanceSchedule.objects.filter(
+                    trigger_type=MaintenanceSchedule.TRIGGER_USAGE,
+                    asset_id__in={asset_id for asset_id, _ in result.affected},
+                )
+            )
+    return result
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import threading
 
+from .audit import audit_buffer
+
 _thread_local = threading.local()
 
 
@@ -21,4 +23,15 @@ class CurrentUserMiddleware:
         set_current_user(getattr(request, "user", None))
         response = self.get_response(request)
         set_current_user(None)
-        return response
+        return response
+
+
+class AuditBufferMiddleware:
+    """Write the audit entries of one request with a single bulk insert."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with audit_buffer():
+            return self.get_response(request)
@@ -0,0 +1,67 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+SOURCE_SQL = """
+    SELECT a.id, a.code, a.name, c.code || ' ' || c.name, l.name
+    FROM inventaris_asset a
+    JOIN inventaris_category c ON c.id = a.category_id
+    JOIN inventaris_location l ON l.id = a.current_location_id
+    WHERE a.deleted_at IS NULL
+"""
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            try:
+                cursor.execute(
+                    "CREATE VIRTUAL TABLE inventaris_asset_search USING fts5("
+                    "code, name, category, location, "
+                    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+                )
+            except OperationalError:
+                # SQLite built without FTS5: search falls back to icontains.
+                return
+            cursor.execute(
+                "INSERT INTO inventaris_asset_search (rowid, code, name, category, location) "
+                + SOURCE_SQL
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                "CREATE TABLE inventaris_asset_search ("
+                "asset_id bigint PRIMARY KEY REFERENCES inventaris_asset (id) "
+                "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+                "document tsvector NOT NULL)"
+            )
+            cursor.execute(
+                "CREATE INDEX inventaris_asset_search_document "
+                "ON inventaris_asset_search USING GIN (document)"
+            )
+            cursor.execute(
+                "INSERT INTO inventaris_asset_search (asset_id, document) "
+                "SELECT src.id, "
+                "setweight(to_tsvector('simple', src.code), 'A') "
+                "|| setweight(to_tsvector('simple', src.name), 'A') "
+                "|| setweight(to_tsvector('simple', src.category), 'B') "
+                "|| setweight(to_tsvector('simple', src.location), 'C') "
+                "FROM (" + SOURCE_SQL + ") AS src (id, code, name, category, location)"
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor in {'sqlite', 'postgresql'}:
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS inventaris_asset_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventaris', '0009_dataversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
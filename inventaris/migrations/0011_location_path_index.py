@@ -0,0 +1,17 @@
+# Generated by Django 4.0.8 on 2026-10-16 23:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventaris', '0010_asset_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['path'], name='inventaris__path_f52db4_idx'),
+        ),
+    ]
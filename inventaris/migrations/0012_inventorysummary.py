@@ -0,0 +1,54 @@
+# Generated by Django 4.0.8 on 2026-10-16 23:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_summary(apps, schema_editor):
+    Asset = apps.get_model('inventaris', 'Asset')
+    InventorySummary = apps.get_model('inventaris', 'InventorySummary')
+    grouped = (
+        Asset.objects.filter(deleted_at__isnull=True)
+        .order_by()
+        .values_list('category_id', 'current_location_id', 'status', 'condition')
+        .annotate(total=models.Count('id'))
+    )
+    InventorySummary.objects.bulk_create(
+        [
+            InventorySummary(
+                category_id=category_id,
+                location_id=location_id,
+                status=status,
+                condition=condition,
+                count=total,
+            )
+            for category_id, location_id, status, condition, total in grouped
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventaris', '0011_location_path_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('AKTIF', 'Aktif'), ('DIPINJAM', 'Dipinjam'), ('RUSAK', 'Rusak'), ('DIHAPUS', 'Dihapus')], max_length=20)),
+                ('condition', models.CharField(choices=[('BAIK', 'Baik'), ('RUSAK_RINGAN', 'Rusak Ringan'), ('RUSAK_BERAT', 'Rusak Berat')], max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventaris.category')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventaris.location')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='inventorysummary',
+            constraint=models.UniqueConstraint(fields=('category', 'location', 'status', 'condition'), name='uniq_inventory_summary_cell'),
+        ),
+        migrations.RunPython(populate_summary, migrations.RunPython.noop),
+    ]
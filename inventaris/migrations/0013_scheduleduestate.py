@@ -0,0 +1,88 @@
+# Generated by Django 4.0.8 on 2026-10-16 23:41
+
+import datetime
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def populate_due_states(apps, schema_editor):
+    MaintenanceSchedule = apps.get_model('inventaris', 'MaintenanceSchedule')
+    AssetMeterReading = apps.get_model('inventaris', 'AssetMeterReading')
+    ScheduleDueState = apps.get_model('inventaris', 'ScheduleDueState')
+    today = datetime.date.today()
+    now = django.utils.timezone.now()
+    latest = models.Subquery(
+        AssetMeterReading.objects.filter(
+            asset_id=models.OuterRef('asset_id'),
+            reading_type=models.OuterRef('usage_reading_type'),
+        )
+        .order_by('-reading_at', '-id')
+        .values('reading_value')[:1]
+    )
+    states = []
+    for schedule in MaintenanceSchedule.objects.annotate(latest_usage=latest).iterator():
+        state = ScheduleDueState(
+            schedule_id=schedule.pk,
+            asset_id=schedule.asset_id,
+            trigger_type=schedule.trigger_type,
+            state='OK',
+            next_due_date=schedule.next_due_date,
+            evaluated_at=now,
+        )
+        if schedule.trigger_type == 'TIME' and schedule.next_due_date:
+            if schedule.next_due_date == today:
+                state.state = 'DUE'
+            elif schedule.next_due_date < today:
+                state.state = 'OVERDUE'
+        elif (
+            schedule.trigger_type == 'USAGE'
+            and schedule.usage_reading_type
+            and schedule.next_due_usage is not None
+        ):
+            current = schedule.latest_usage if schedule.latest_usage is not None else schedule.last_usage_value
+            due = schedule.next_due_usage
+            state.current_usage = current
+            state.next_due_usage = due
+            if current is not None:
+                if current > due:
+                    state.state = 'OVERDUE'
+                elif current == due:
+                    state.state = 'DUE'
+                elif schedule.usage_interval and current >= due - max(1, int(schedule.usage_interval * 0.1)):
+                    state.state = 'WARNING'
+        states.append(state)
+    ScheduleDueState.objects.bulk_create(states, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventaris', '0012_inventorysummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleDueState',
+            fields=[
+                ('schedule', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='due_state', serialize=False, to='inventaris.maintenanceschedule')),
+                ('trigger_type', models.CharField(choices=[('TIME', 'Time-based'), ('USAGE', 'Usage-based'), ('CONDITION', 'Condition-based'), ('EVENT', 'Event-based')], max_length=20)),
+                ('state', models.CharField(choices=[('OK', 'Aman'), ('WARNING', 'Mendekati'), ('DUE', 'Jatuh Tempo'), ('OVERDUE', 'Terlambat')], default='OK', max_length=20)),
+                ('next_due_date', models.DateField(blank=True, null=True)),
+                ('current_usage', models.PositiveIntegerField(blank=True, null=True)),
+                ('next_due_usage', models.PositiveIntegerField(blank=True, null=True)),
+                ('evaluated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('asset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventaris.asset')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='scheduleduestate',
+            index=models.Index(fields=['trigger_type', 'next_due_date'], name='inventaris__trigger_2ef342_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduleduestate',
+            index=models.Index(fields=['trigger_type', 'state'], name='inventaris__trigger_f25a38_idx'),
+        ),
+        migrations.RunPython(populate_due_states, migrations.RunPython.noop),
+    ]
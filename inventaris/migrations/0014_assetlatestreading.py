@@ -0,0 +1,71 @@
+# Generated by Django 4.0.8 on 2026-10-16 23:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_latest_readings(apps, schema_editor):
+    AssetMeterReading = apps.get_model('inventaris', 'AssetMeterReading')
+    AssetLatestReading = apps.get_model('inventaris', 'AssetLatestReading')
+    newest = models.Subquery(
+        AssetMeterReading.objects.filter(
+            asset_id=models.OuterRef('asset_id'),
+            reading_type=models.OuterRef('reading_type'),
+        )
+        .order_by('-reading_at', '-id')
+        .values('id')[:1]
+    )
+    latest = AssetMeterReading.objects.filter(id=newest).values_list(
+        'id', 'asset_id', 'reading_type', 'reading_value', 'reading_at'
+    )
+    AssetLatestReading.objects.bulk_create(
+        [
+            AssetLatestReading(
+                reading_id=reading_id,
+                asset_id=asset_id,
+                reading_type=reading_type,
+                reading_value=reading_value,
+                reading_at=reading_at,
+            )
+            for reading_id, asset_id, reading_type, reading_value, reading_at in latest.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventaris', '0013_scheduleduestate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetLatestReading',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reading_type', models.CharField(choices=[('KM', 'Kilometer'), ('HOUR', 'Jam Operasi'), ('CYCLE', 'Cycle Count')], max_length=20)),
+                ('reading_value', models.PositiveIntegerField()),
+                ('reading_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='assetmeterreading',
+            index=models.Index(fields=['asset', 'reading_type', 'reading_at'], name='inventaris__asset_i_a4b013_idx'),
+        ),
+        migrations.AddField(
+            model_name='assetlatestreading',
+            name='asset',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='latest_readings', to='inventaris.asset'),
+        ),
+        migrations.AddField(
+            model_name='assetlatestreading',
+            name='reading',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventaris.assetmeterreading'),
+        ),
+        migrations.AddConstraint(
+            model_name='assetlatestreading',
+            constraint=models.UniqueConstraint(fields=('asset', 'reading_type'), name='uniq_latest_reading'),
+        ),
+        migrations.RunPython(populate_latest_readings, migrations.RunPython.noop),
+    ]
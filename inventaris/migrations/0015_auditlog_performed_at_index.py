@@ -0,0 +1,17 @@
+# Generated by Django 4.0.8 on 2026-10-16 23:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventaris', '0014_assetlatestreading'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['performed_at'], name='inventaris__perform_8798bb_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.0.8 on 2026-10-16 23:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventaris', '0015_auditlog_performed_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['entity', 'entity_id', 'performed_at'], name='inventaris__entity_66fce7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['performed_by', 'performed_at'], name='inventaris__perform_0a6a3c_idx'),
+        ),
+    ]
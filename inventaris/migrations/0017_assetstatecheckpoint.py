@@ -0,0 +1,50 @@
+# Generated by Django 4.0.8 on 2026-10-16 23:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventaris', '0016_auditlog_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetStateCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField()),
+                ('status', models.CharField(choices=[('AKTIF', 'Aktif'), ('DIPINJAM', 'Dipinjam'), ('RUSAK', 'Rusak'), ('DIHAPUS', 'Dihapus')], max_length=20)),
+                ('condition', models.CharField(choices=[('BAIK', 'Baik'), ('RUSAK_RINGAN', 'Rusak Ringan'), ('RUSAK_BERAT', 'Rusak Berat')], max_length=20)),
+                ('responsible_user_ids', models.JSONField(default=list)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='assetlocationhistory',
+            index=models.Index(fields=['asset', 'moved_at'], name='inventaris__asset_i_465a65_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assetlocationhistory',
+            index=models.Index(fields=['moved_at'], name='inventaris__moved_a_97326e_idx'),
+        ),
+        migrations.AddField(
+            model_name='assetstatecheckpoint',
+            name='asset',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventaris.asset'),
+        ),
+        migrations.AddField(
+            model_name='assetstatecheckpoint',
+            name='location',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventaris.location'),
+        ),
+        migrations.AddIndex(
+            model_name='assetstatecheckpoint',
+            index=models.Index(fields=['taken_at'], name='inventaris__taken_a_3c7bbc_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='assetstatecheckpoint',
+            constraint=models.UniqueConstraint(fields=('asset', 'taken_at'), name='uniq_asset_checkpoint'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+def create_path_pattern_index(apps, schema_editor):
+    # Location.path_prefix_q() uses LIKE 'prefix%' on PostgreSQL; a plain
+    # btree index only serves that under the C collation.
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE INDEX inventaris_location_path_like "
+                "ON inventaris_location (path varchar_pattern_ops)"
+            )
+
+
+def drop_path_pattern_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("DROP INDEX IF EXISTS inventaris_location_path_like")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventaris', '0017_assetstatecheckpoint'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_path_pattern_index, drop_path_pattern_index),
+    ]
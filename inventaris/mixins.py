@@ -3,6 +3,7 @@ from __future__ import annotations
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
 
+from .pagination import KeysetPaginator, approximate_count
 from .rbac import user_in_roles
 
 
@@ -12,4 +13,37 @@ class RoleRequiredMixin(LoginRequiredMixin):
     def dispatch(self, request, *args, **kwargs):
         if self.allowed_roles and not user_in_roles(request.user, self.allowed_roles):
             raise PermissionDenied
-        return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+
+class KeysetPaginationMixin:
+    """ListView paging by ``?after=``/``?before=`` cursors instead of ``?page=``.
+
+    ``?count=approx`` adds an approximate total to the context; it is never
+    computed otherwise.
+    """
+
+    keyset_ordering: tuple[str, ...] = ("pk",)
+    paginate_by = 50
+
+    def get_keyset_paginator(self, queryset, page_size):
+        return KeysetPaginator(queryset, self.keyset_ordering, page_size)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = self.get_keyset_paginator(queryset, page_size)
+        page = paginator.page(
+            after=self.request.GET.get("after"),
+            before=self.request.GET.get("before"),
+        )
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        params = self.request.GET.copy()
+        for key in ("after", "before"):
+            params.pop(key, None)
+        context["pager_query"] = params.urlencode()
+        context["approximate_count"] = (
+            approximate_count(self.object_list) if params.get("count") == "approx" else None
+        )
+        return context
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import threading
+
 from django.conf import settings
-from django.db import models, transaction
+from django.db import connection, models, transaction
+from django.db.models.functions import Concat, Substr
 from django.utils import timezone
 
 
@@ -40,22 +43,88 @@ class Location(TimeStampedModel):
 
     class Meta:
         ordering = ["path", "name"]
+        indexes = [
+            models.Index(fields=["path"]),
+        ]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._original_parent_id = self.parent_id
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        parent = self.parent
-        new_path = f"{parent.path}/{self.pk}" if parent else str(self.pk)
-        new_level = (parent.level + 1) if parent else 0
-        if self.path != new_path or self.level != new_level:
-            Location.objects.filter(pk=self.pk).update(path=new_path, level=new_level)
-            self.path = new_path
-            self.level = new_level
+        if self.pk is None:
+            # The path ends with our own id, so a new row needs a second write.
+            super().save(*args, **kwargs)
+            parent = self.parent
+            self.path = f"{parent.path}/{self.pk}" if parent else str(self.pk)
+            self.level = (parent.level + 1) if parent else 0
+            Location.objects.filter(pk=self.pk).update(path=self.path, level=self.level)
+        elif self.parent_id == self._original_parent_id and self.path:
+            super().save(*args, **kwargs)
+        else:
+            self._save_moved(*args, **kwargs)
         self._original_parent_id = self.parent_id
 
+    def _save_moved(self, *args, **kwargs):
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "parent", "path", "level"}
+        with transaction.atomic():
+            # Read both paths fresh: in-memory instances may predate an
+            # earlier move of either subtree.
+            current = dict(
+                Location.objects.filter(pk__in=[self.pk, self.parent_id]).values_list(
+                    "pk", "path"
+                )
+            )
+            old_path = current.get(self.pk, "")
+            parent_path = current.get(self.parent_id)
+            if parent_path is not None and (
+                self.parent_id == self.pk or parent_path.startswith(f"{old_path}/")
+            ):
+                raise ValueError("Lokasi tidak dapat dipindahkan ke dalam turunannya sendiri.")
+            old_level = old_path.count("/")
+            self.path = f"{parent_path}/{self.pk}" if parent_path is not None else str(self.pk)
+            self.level = self.path.count("/")
+            super().save(*args, **kwargs)
+            if old_path:
+                # Swap the path prefix of every descendant in one statement.
+                Location.objects.filter(self.path_prefix_q(f"{old_path}/")).update(
+                    path=Concat(models.Value(self.path), Substr("path", len(old_path) + 1)),
+                    level=models.F("level") + (self.level - old_level),
+                )
+
+    def move_to(self, parent: "Location | None"):
+        self.parent = parent
+        self.save()
+
+    @staticmethod
+    def path_prefix_q(prefix: str) -> models.Q:
+        """Locations whose path starts with ``prefix`` (which ends in "/")."""
+        if connection.vendor == "sqlite":
+            # SQLite compares text bytewise, where "0" sorts right after "/",
+            # so ["5/", "50") is a plain range scan on the path index.
+            return models.Q(path__gte=prefix, path__lt=f"{prefix[:-1]}0")
+        # Under a locale collation (the PostgreSQL default) punctuation does
+        # not order that way; LIKE 'prefix%' uses the pattern_ops index instead.
+        return models.Q(path__startswith=prefix)
+
+    def descendants_q(self) -> models.Q:
+        return models.Q(path=self.path) | self.path_prefix_q(f"{self.path}/")
+
+    def subtree_q(self, field: str = "current_location") -> models.Q:
+        subtree = Location.objects.filter(self.descendants_q()).values("pk")
+        return models.Q(**{f"{field}__in": subtree})
+
+    @classmethod
+    def subtree_q_for(cls, location_id, field: str = "current_location") -> models.Q:
+        try:
+            location = cls.objects.only("path").filter(pk=location_id).first()
+        except (TypeError, ValueError):
+            location = None
+        if location is None:
+            return models.Q(pk__in=[])
+        return location.subtree_q(field)
+
     def __str__(self) -> str:
         return self.name
 
@@ -74,15 +143,135 @@ class AssetCodeCounter(models.Model):
     def next_code(cls, acquired_date: timezone.datetime.date) -> str:
         year = acquired_date.year
         month = acquired_date.month
+        block_size = getattr(settings, "ASSET_CODE_BLOCK_SIZE", 1)
+        if block_size > 1:
+            return cls.format_code(year, month, _code_pool.take(year, month, block_size))
+        start, _end = cls.reserve_range(year, month, 1)
+        return cls.format_code(year, month, start)
+
+    @staticmethod
+    def format_code(year: int, month: int, number: int) -> str:
+        return f"{year:04d}-{month:02d}-{number:04d}"
+
+    @classmethod
+    def reserve_range(cls, year: int, month: int, count: int) -> tuple[int, int]:
+        """Claim counter numbers ``start..end`` (inclusive) for (year, month).
+
+        One conditional UPDATE bumps the counter by ``count`` so the row lock is
+        held only for that statement, not for a SELECT ... FOR UPDATE round trip.
+        """
+        if count <= 0:
+            raise ValueError("count must be positive")
         with transaction.atomic():
-            counter_obj, _ = cls.objects.select_for_update().get_or_create(
-                year=year,
-                month=month,
-                defaults={"counter": 0},
-            )
-            counter_obj.counter += 1
-            counter_obj.save(update_fields=["counter"])
-        return f"{year:04d}-{month:02d}-{counter_obj.counter:04d}"
+            row = cls.objects.filter(year=year, month=month)
+            if not row.update(counter=models.F("counter") + count):
+                _, created = cls.objects.get_or_create(
+                    year=year, month=month, defaults={"counter": count}
+                )
+                if not created:
+                    row.update(counter=models.F("counter") + count)
+            end = row.values_list("counter", flat=True).get()
+        return end - count + 1, end
+
+    @classmethod
+    def reserve_codes(cls, year: int, month: int, count: int) -> list[str]:
+        """Claim ``count`` consecutive codes for (year, month) with one counter update."""
+        if count <= 0:
+            return []
+        start, end = cls.reserve_range(year, month, count)
+        return [cls.format_code(year, month, number) for number in range(start, end + 1)]
+
+
+class _ReservedBlock:
+    """Numbers ``next..end`` reserved by a transaction that has not committed yet.
+
+    It is also that transaction's on_commit callback, which hands the rest of
+    the block to the shared pool.
+    """
+
+    def __init__(self, pool: "_CodePool", key: tuple[int, int], start: int, end: int):
+        self.pool = pool
+        self.key = key
+        self.next = start
+        self.end = end
+
+    def __call__(self):
+        self.pool._release(self)
+
+
+class _CodePool:
+    """Per-process blocks of reserved counter numbers (``ASSET_CODE_BLOCK_SIZE`` > 1).
+
+    The transaction that reserves a block draws from it first; the rest is
+    handed to other callers once that transaction commits. If it rolls back,
+    the counter update is undone and the block is dropped with it.
+    Numbers left in a block when the process exits are never used (gaps).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ranges: dict[tuple[int, int], list[list[int]]] = {}
+        self._local = threading.local()
+
+    def _open_blocks(self) -> dict:
+        if not hasattr(self._local, "blocks"):
+            self._local.blocks = {}
+        return self._local.blocks
+
+    def _own_block(self, key: tuple[int, int]) -> _ReservedBlock | None:
+        """This transaction's uncommitted block for ``key``, if it is still usable."""
+        connection = transaction.get_connection()
+        block = self._open_blocks().get(key)
+        if block is None or not connection.in_atomic_block:
+            return None
+        # Rolling back the (save)point that reserved the block drops its
+        # callback; the counter update went with it, so the block is void.
+        if block.next > block.end or not any(func is block for _, func in connection.run_on_commit):
+            del self._open_blocks()[key]
+            return None
+        return block
+
+    def take(self, year: int, month: int, block_size: int) -> int:
+        key = (year, month)
+        block = self._own_block(key)
+        if block is not None:
+            number = block.next
+            block.next += 1
+            return number
+        with self._lock:
+            ranges = self._ranges.get(key)
+            if ranges:
+                current = ranges[0]
+                number = current[0]
+                current[0] += 1
+                if current[0] > current[1]:
+                    ranges.pop(0)
+                return number
+        start, end = AssetCodeCounter.reserve_range(year, month, block_size)
+        if end > start:
+            block = _ReservedBlock(self, key, start + 1, end)
+            if transaction.get_connection().in_atomic_block:
+                self._open_blocks()[key] = block
+            transaction.on_commit(block)
+        return start
+
+    def _release(self, block: _ReservedBlock):
+        if self._open_blocks().get(block.key) is block:
+            del self._open_blocks()[block.key]
+        if block.next <= block.end:
+            self._put(block.key, block.next, block.end)
+
+    def _put(self, key: tuple[int, int], start: int, end: int):
+        with self._lock:
+            self._ranges.setdefault(key, []).append([start, end])
+
+    def clear(self):
+        with self._lock:
+            self._ranges.clear()
+        self._open_blocks().clear()
+
+
+_code_pool = _CodePool()
 
 
 class Asset(TimeStampedModel):
@@ -144,17 +333,80 @@ class Asset(TimeStampedModel):
             models.Index(fields=["current_location"]),
         ]
 
+    # Fields whose before/after values feed the audit log and summary counters.
+    AUDITED_FIELDS = ("status", "condition", "current_location_id", "category_id", "deleted_at")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded(cls.AUDITED_FIELDS)
+        return instance
+
+    def _remember_loaded(self, attnames):
+        loaded = dict(getattr(self, "_loaded_values", {}))
+        loaded.update({name: self.__dict__[name] for name in attnames if name in self.__dict__})
+        self._loaded_values = loaded
+
+    def _attnames(self, field_names) -> list[str]:
+        return [self._meta.get_field(name).attname for name in field_names]
+
+    def loaded_values(self) -> dict | None:
+        """Audited values as last read from or written to the DB, or None if unknown."""
+        loaded = getattr(self, "_loaded_values", {})
+        if any(name not in loaded for name in self.AUDITED_FIELDS):
+            return None
+        return dict(loaded)
+
+    def loaded_responsible_ids(self) -> list[int] | None:
+        """Responsible user ids as last read or written through this instance, or None."""
+        ids = getattr(self, "_loaded_responsible_ids", None)
+        return None if ids is None else list(ids)
+
+    def remember_responsible_ids(self, ids: list[int]):
+        self._loaded_responsible_ids = list(ids)
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._remember_loaded(self.AUDITED_FIELDS if fields is None else self._attnames(fields))
+        if fields is None or "responsible_users" in fields:
+            self._loaded_responsible_ids = None
+
     def save(self, *args, **kwargs):
         if not self.code:
             if not self.acquired_date:
                 raise ValueError("acquired_date is required to generate asset code")
             self.code = AssetCodeCounter.next_code(self.acquired_date)
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        if adding:
+            # A row that was just inserted cannot have responsible users yet.
+            self._loaded_responsible_ids = []
+        update_fields = kwargs.get("update_fields")
+        self._remember_loaded(self.AUDITED_FIELDS if update_fields is None else self._attnames(update_fields))
 
     def __str__(self) -> str:
         return f"{self.code} - {self.name}"
 
 
+class InventorySummary(models.Model):
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="+")
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name="+")
+    status = models.CharField(max_length=20, choices=Asset.STATUS_CHOICES)
+    condition = models.CharField(max_length=20, choices=Asset.CONDITION_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category", "location", "status", "condition"],
+                name="uniq_inventory_summary_cell",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.category_id}/{self.location_id}/{self.status}/{self.condition}={self.count}"
+
+
 class AssetResponsibility(TimeStampedModel):
     asset = models.ForeignKey(Asset, on_delete=models.CASCADE)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT)
@@ -187,6 +439,34 @@ class AssetLocationHistory(TimeStampedModel):
     moved_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT)
     note = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["asset", "moved_at"]),
+            models.Index(fields=["moved_at"]),
+        ]
+
+
+class AssetStateCheckpoint(models.Model):
+    """Asset state captured at ``taken_at``; bounds how far time travel replays."""
+
+    asset = models.ForeignKey(Asset, on_delete=models.CASCADE, related_name="+")
+    taken_at = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=Asset.STATUS_CHOICES)
+    condition = models.CharField(max_length=20, choices=Asset.CONDITION_CHOICES)
+    location = models.ForeignKey(Location, on_delete=models.PROTECT, null=True, related_name="+")
+    responsible_user_ids = models.JSONField(default=list)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["asset", "taken_at"], name="uniq_asset_checkpoint"),
+        ]
+        indexes = [
+            models.Index(fields=["taken_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.asset_id} @ {self.taken_at:%Y-%m-%d %H:%M}"
+
 
 class AssetPhoto(TimeStampedModel):
     asset = models.ForeignKey(Asset, on_delete=models.CASCADE)
@@ -215,6 +495,25 @@ class AssetMeterReading(TimeStampedModel):
 
     class Meta:
         ordering = ["-reading_at", "-id"]
+        indexes = [
+            models.Index(fields=["asset", "reading_type", "reading_at"]),
+        ]
+
+
+class AssetLatestReading(models.Model):
+    asset = models.ForeignKey(Asset, on_delete=models.CASCADE, related_name="latest_readings")
+    reading_type = models.CharField(max_length=20, choices=AssetMeterReading.TYPE_CHOICES)
+    reading = models.ForeignKey(AssetMeterReading, on_delete=models.CASCADE, related_name="+")
+    reading_value = models.PositiveIntegerField()
+    reading_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["asset", "reading_type"], name="uniq_latest_reading"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.asset_id} {self.reading_type}={self.reading_value}"
 
 
 class MaintenanceSchedule(TimeStampedModel):
@@ -285,6 +584,43 @@ class MaintenanceSchedule(TimeStampedModel):
         return f"{label} | {self.asset.code} | {self.get_trigger_type_display()}"
 
 
+class ScheduleDueState(models.Model):
+    STATE_OK = "OK"
+    STATE_WARNING = "WARNING"
+    STATE_DUE = "DUE"
+    STATE_OVERDUE = "OVERDUE"
+
+    STATE_CHOICES = [
+        (STATE_OK, "Aman"),
+        (STATE_WARNING, "Mendekati"),
+        (STATE_DUE, "Jatuh Tempo"),
+        (STATE_OVERDUE, "Terlambat"),
+    ]
+
+    schedule = models.OneToOneField(
+        MaintenanceSchedule,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="due_state",
+    )
+    asset = models.ForeignKey(Asset, on_delete=models.CASCADE, related_name="+")
+    trigger_type = models.CharField(max_length=20, choices=MaintenanceSchedule.TRIGGER_CHOICES)
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default=STATE_OK)
+    next_due_date = models.DateField(null=True, blank=True)
+    current_usage = models.PositiveIntegerField(null=True, blank=True)
+    next_due_usage = models.PositiveIntegerField(null=True, blank=True)
+    evaluated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["trigger_type", "next_due_date"]),
+            models.Index(fields=["trigger_type", "state"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.schedule_id}: {self.state}"
+
+
 class Maintenance(TimeStampedModel):
     TYPE_RUTIN = "RUTIN"
     TYPE_INSIDENTAL = "INSIDENTAL"
@@ -357,4 +693,132 @@ class AuditLog(TimeStampedModel):
     action = models.CharField(max_length=50)
     changes = models.JSONField()
     performed_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT)
-    performed_at = models.DateTimeField(default=timezone.now)
+    performed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["performed_at"]),
+            models.Index(fields=["entity", "entity_id", "performed_at"]),
+            models.Index(fields=["performed_by", "performed_at"]),
+        ]
+
+
+class ExportJob(TimeStampedModel):
+    REPORT_ASSET = "ASSET"
+    REPORT_MAINTENANCE = "MAINTENANCE"
+
+    FORMAT_XLSX = "XLSX"
+    FORMAT_PDF = "PDF"
+    FORMAT_CSV = "CSV"
+    FORMAT_NDJSON = "NDJSON"
+
+    STATUS_PENDING = "PENDING"
+    STATUS_RUNNING = "RUNNING"
+    STATUS_DONE = "DONE"
+    STATUS_FAILED = "FAILED"
+    STATUS_EXPIRED = "EXPIRED"
+
+    REPORT_CHOICES = [
+        (REPORT_ASSET, "Laporan Aset"),
+        (REPORT_MAINTENANCE, "Laporan Pemeliharaan"),
+    ]
+
+    FORMAT_CHOICES = [
+        (FORMAT_XLSX, "Excel"),
+        (FORMAT_PDF, "PDF"),
+        (FORMAT_CSV, "CSV"),
+        (FORMAT_NDJSON, "NDJSON"),
+    ]
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Menunggu"),
+        (STATUS_RUNNING, "Diproses"),
+        (STATUS_DONE, "Selesai"),
+        (STATUS_FAILED, "Gagal"),
+        (STATUS_EXPIRED, "Kedaluwarsa"),
+    ]
+
+    report_type = models.CharField(max_length=20, choices=REPORT_CHOICES)
+    file_format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    rows_total = models.PositiveIntegerField(null=True, blank=True)
+    rows_processed = models.PositiveIntegerField(default=0)
+    file = models.FileField(upload_to="exports/", blank=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["status", "expires_at"]),
+        ]
+
+    @property
+    def progress_percent(self) -> int | None:
+        if not self.rows_total:
+            return 100 if self.status == self.STATUS_DONE else None
+        return min(100, int(self.rows_processed * 100 / self.rows_total))
+
+    def __str__(self) -> str:
+        return f"{self.get_report_type_display()} ({self.file_format}) #{self.pk}"
+
+
+_pending_versions = threading.local()
+
+
+class _PendingVersionBump:
+    def __init__(self, model):
+        self.model = model
+        self.names: set[str] = set()
+
+    def __call__(self):
+        if getattr(_pending_versions, "bump", None) is self:
+            _pending_versions.bump = None
+        self.model.bump(*sorted(self.names))
+
+
+class DataVersion(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def bump(cls, *names: str):
+        for name in names:
+            updated = cls.objects.filter(name=name).update(version=models.F("version") + 1)
+            if not updated:
+                obj, created = cls.objects.get_or_create(name=name, defaults={"version": 1})
+                if not created:
+                    cls.objects.filter(pk=obj.pk).update(version=models.F("version") + 1)
+
+    @classmethod
+    def bump_on_commit(cls, *names: str):
+        """Bump ``names`` once when the current transaction commits.
+
+        A transaction that writes many rows touches each version row a single
+        time, after its own locks are released, instead of once per save.
+        """
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            cls.bump(*names)
+            return
+        pending = getattr(_pending_versions, "bump", None)
+        # The callback is dropped when its (save)point rolls back; start a new
+        # one then so later writes in the surviving transaction still count.
+        if pending is None or not any(func is pending for _, func in connection.run_on_commit):
+            pending = _PendingVersionBump(cls)
+            _pending_versions.bump = pending
+            transaction.on_commit(pending)
+        pending.names.update(names)
+
+    @classmethod
+    def current(cls, *names: str) -> dict[str, int]:
+        versions = dict(cls.objects.filter(name__in=names).values_list("name", "version"))
+        return {name: versions.get(name, 0) for name in names}
+
+    def __str__(self) -> str:
+        return f"{self.name}@{self.version}"
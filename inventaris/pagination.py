@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from datetime import datetime, time
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+
+APPROXIMATE_COUNT_TIMEOUT = 300
+
+
+class KeysetPage:
+    def __init__(self, object_list: list, has_next: bool, has_previous: bool, ordering, model):
+        self.object_list = object_list
+        self.has_next_page = has_next
+        self.has_previous_page = has_previous
+        self._ordering = ordering
+        self._model = model
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        return self.has_next_page
+
+    def has_previous(self) -> bool:
+        return self.has_previous_page
+
+    def has_other_pages(self) -> bool:
+        return self.has_next_page or self.has_previous_page
+
+    @property
+    def next_cursor(self) -> str | None:
+        if not self.has_next_page or not self.object_list:
+            return None
+        return encode_cursor(self.object_list[-1], self._ordering, self._model)
+
+    @property
+    def previous_cursor(self) -> str | None:
+        if not self.has_previous_page or not self.object_list:
+            return None
+        return encode_cursor(self.object_list[0], self._ordering, self._model)
+
+
+def _split(ordering: str) -> tuple[str, bool]:
+    return (ordering[1:], True) if ordering.startswith("-") else (ordering, False)
+
+
+def _attname(model, name: str) -> str:
+    if name == "pk":
+        return model._meta.pk.attname
+    return model._meta.get_field(name).attname
+
+
+def _cursor_value(value):
+    # DjangoJSONEncoder cuts datetimes and times down to milliseconds, which
+    # would make the seek skip rows sharing the cursor row's millisecond.
+    if isinstance(value, (datetime, time)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(obj, ordering: tuple[str, ...], model) -> str:
+    if isinstance(obj, dict):
+        values = [obj[_split(item)[0]] for item in ordering]
+    else:
+        values = [getattr(obj, _attname(model, _split(item)[0])) for item in ordering]
+    raw = json.dumps([_cursor_value(value) for value in values], cls=DjangoJSONEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str | None, ordering: tuple[str, ...], model) -> list | None:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            return None
+        fields = [
+            model._meta.pk if name == "pk" else model._meta.get_field(name)
+            for name, _ in map(_split, ordering)
+        ]
+        return [field.to_python(value) for field, value in zip(fields, values)]
+    except (ValueError, TypeError, LookupError, ValidationError):
+        return None
+
+
+def seek_q(ordering: tuple[str, ...], values: list, forward: bool = True) -> Q:
+    """Build ``(a, b) > (x, y)`` style row comparisons for any mix of directions."""
+    condition = Q()
+    equal = Q()
+    for item, value in zip(ordering, values):
+        name, descending = _split(item)
+        lookup = "lt" if descending == forward else "gt"
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+class KeysetPaginator:
+    """Seek-based paging: each page is one indexed range scan with LIMIT.
+
+    Unlike Django's Paginator there is no OFFSET and no COUNT(*); pages are
+    addressed by an opaque cursor holding the ordering values of the first or
+    last row shown.
+    """
+
+    def __init__(self, queryset, ordering: tuple[str, ...], per_page: int):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.model = queryset.model
+
+    def _reversed(self) -> tuple[str, ...]:
+        return tuple(item[1:] if item.startswith("-") else f"-{item}" for item in self.ordering)
+
+    def page(self, after: str | None = None, before: str | None = None) -> KeysetPage:
+        before_values = decode_cursor(before, self.ordering, self.model)
+        if before_values is not None:
+            rows = list(
+                self.queryset.filter(seek_q(self.ordering, before_values, forward=False))
+                .order_by(*self._reversed())[: self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            rows = rows[: self.per_page]
+            rows.reverse()
+            return KeysetPage(rows, True, has_previous, self.ordering, self.model)
+
+        after_values = decode_cursor(after, self.ordering, self.model)
+        qs = self.queryset
+        if after_values is not None:
+            qs = qs.filter(seek_q(self.ordering, after_values))
+        rows = list(qs.order_by(*self.ordering)[: self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[: self.per_page], has_next, after_values is not None, self.ordering, self.model)
+
+
+def approximate_count(queryset) -> int:
+    """Row count for pagers that do not need to be exact.
+
+    PostgreSQL answers from the planner estimate; other backends run one real
+    COUNT(*) and reuse it for a few minutes per distinct query.
+    """
+    connection = connections[queryset.db]
+    sql, params = queryset.order_by().query.sql_with_params()
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    key = "approx-count:" + hashlib.sha256(
+        json.dumps([sql, params], cls=DjangoJSONEncoder, default=str).encode("utf-8")
+    ).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, APPROXIMATE_COUNT_TIMEOUT)
+    return count
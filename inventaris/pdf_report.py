@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import functools
+import itertools
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Iterable, Iterator
+
+# This module is imported by spawned worker processes, so it must not depend
+# on Django being configured. Callers pass plain row lists in.
+
+ROWS_PER_PAGE = 36
+PAGES_PER_CHUNK = 20
+FONT = "Helvetica"
+FONT_BOLD = "Helvetica-Bold"
+FONT_SIZE = 8
+CELL_PADDING = 3
+MARGIN = 30
+
+LABEL_COLUMNS = 3
+LABEL_ROWS = 8
+LABELS_PER_PAGE = LABEL_COLUMNS * LABEL_ROWS
+
+
+def _fit(text: str, width: float, font: str = FONT, size: float = FONT_SIZE) -> str:
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    if stringWidth(text, font, size) <= width:
+        return text
+    ellipsis = "..."
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if stringWidth(text[:mid] + ellipsis, font, size) <= width:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low] + ellipsis
+
+
+def _draw_table_pages(p, rows: list[list], first_page: int, title: str, header: list[str], widths: list[float]):
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.platypus import Table, TableStyle
+
+    page_width, page_height = landscape(A4)
+    style = TableStyle(
+        [
+            ("FONT", (0, 0), (-1, 0), FONT_BOLD, FONT_SIZE),
+            ("FONT", (0, 1), (-1, -1), FONT, FONT_SIZE),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e9ecef")),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("LEFTPADDING", (0, 0), (-1, -1), CELL_PADDING),
+            ("RIGHTPADDING", (0, 0), (-1, -1), CELL_PADDING),
+        ]
+    )
+    # Every page holds exactly ROWS_PER_PAGE rows with single-line cells, so a
+    # chunk's page numbers are known before it is rendered.
+    row_height = (page_height - 2 * MARGIN - 40) / (ROWS_PER_PAGE + 1)
+    for offset in range(0, max(len(rows), 1), ROWS_PER_PAGE):
+        page_number = first_page + offset // ROWS_PER_PAGE
+        data = [header] + [
+            [
+                _fit("" if value is None else str(value), width - 2 * CELL_PADDING)
+                for value, width in zip(row, widths)
+            ]
+            for row in rows[offset:offset + ROWS_PER_PAGE]
+        ]
+        table = Table(data, colWidths=widths, rowHeights=row_height)
+        table.setStyle(style)
+        _, table_height = table.wrapOn(p, page_width, page_height)
+        p.setFont(FONT_BOLD, 12)
+        p.drawString(MARGIN, page_height - MARGIN - 12, title)
+        p.setFont(FONT, FONT_SIZE)
+        p.drawRightString(page_width - MARGIN, page_height - MARGIN - 12, f"Halaman {page_number}")
+        table.drawOn(p, MARGIN, page_height - MARGIN - 30 - table_height)
+        p.showPage()
+
+
+def _draw_label_pages(p, labels: list[tuple], first_page: int, qr_cache_dir=None):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.lib.utils import ImageReader
+
+    from .qr import cached_qr_png, make_qr_png
+
+    page_width, page_height = A4
+    label_width = page_width / LABEL_COLUMNS
+    label_height = page_height / LABEL_ROWS
+    qr_size = label_height - 6 * mm
+    for offset in range(0, max(len(labels), 1), LABELS_PER_PAGE):
+        for index, (code, name, location, payload) in enumerate(labels[offset:offset + LABELS_PER_PAGE]):
+            x = (index % LABEL_COLUMNS) * label_width
+            y = page_height - (index // LABEL_COLUMNS + 1) * label_height
+            png = cached_qr_png(payload, qr_cache_dir) if qr_cache_dir else make_qr_png(payload)
+            image = ImageReader(BytesIO(png))
+            p.drawImage(image, x + 3 * mm, y + 3 * mm, qr_size, qr_size)
+            text_x = x + 5 * mm + qr_size
+            text_width = label_width - (text_x - x) - 3 * mm
+            p.setFont(FONT_BOLD, 8)
+            p.drawString(text_x, y + label_height - 9 * mm, _fit(name, text_width, FONT_BOLD, 8))
+            p.setFont(FONT, 8)
+            p.drawString(text_x, y + label_height - 14 * mm, _fit(code, text_width))
+            p.drawString(text_x, y + label_height - 19 * mm, _fit(location or "", text_width))
+        p.showPage()
+
+
+def _render_part(pagesize, draw, items: list, first_page: int) -> bytes:
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=pagesize)
+    draw(p, items, first_page)
+    p.save()
+    return buffer.getvalue()
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    chunk: list = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _write_chunked(fileobj, pagesize, draw, items: Iterable, per_page: int, workers: int | None):
+    """Draw ``items`` in chunks of ``PAGES_PER_CHUNK`` pages, in parallel when it pays off.
+
+    Each chunk is drawn into its own PDF in a worker process and the parts are
+    concatenated in order. Output that fits in one chunk, single-worker setups
+    and installs without pypdf are drawn on one canvas in this process instead.
+
+    The parallel path starts a process pool and keeps every merged page in
+    memory until the final write, so it is meant for the export worker and
+    management commands; web requests pass ``workers=1``. ``None`` uses every
+    CPU core.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(items, per_page * PAGES_PER_CHUNK)
+    first = next(chunks, [])
+    second = next(chunks, None)
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        PdfWriter = None
+
+    if second is None or workers < 2 or PdfWriter is None:
+        from reportlab.pdfgen import canvas
+
+        p = canvas.Canvas(fileobj, pagesize=pagesize)
+        first_page = 1
+        leading = [first] if second is None else [first, second]
+        for chunk in itertools.chain(leading, chunks):
+            draw(p, chunk, first_page)
+            first_page += PAGES_PER_CHUNK
+        p.save()
+        return
+
+    writer = PdfWriter()
+    pending: deque = deque()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+
+        def submit(chunk: list, index: int):
+            pending.append(
+                pool.submit(_render_part, pagesize, draw, chunk, index * PAGES_PER_CHUNK + 1)
+            )
+
+        def collect():
+            writer.append(BytesIO(pending.popleft().result()))
+
+        submit(first, 0)
+        submit(second, 1)
+        index = 2
+        for chunk in chunks:
+            # Bound the chunks rendering at once; the writer still holds every
+            # merged page until write(), so memory grows with the page count.
+            if len(pending) >= workers * 2:
+                collect()
+            submit(chunk, index)
+            index += 1
+        while pending:
+            collect()
+    writer.write(fileobj)
+
+
+def write_table_pdf(
+    fileobj,
+    title: str,
+    header: list[str],
+    widths: list[float],
+    rows: Iterable[list],
+    workers: int | None = None,
+):
+    from reportlab.lib.pagesizes import A4, landscape
+
+    draw = functools.partial(_draw_table_pages, title=title, header=header, widths=widths)
+    _write_chunked(fileobj, landscape(A4), draw, (list(row) for row in rows), ROWS_PER_PAGE, workers)
+
+
+def write_label_sheet(
+    fileobj,
+    labels: Iterable[tuple],
+    workers: int | None = None,
+    qr_cache_dir=None,
+):
+    """Lay out ``(code, name, location, qr_payload)`` labels 3x8 per A4 page."""
+    from reportlab.lib.pagesizes import A4
+
+    draw = functools.partial(_draw_label_pages, qr_cache_dir=qr_cache_dir and str(qr_cache_dir))
+    _write_chunked(fileobj, A4, draw, labels, LABELS_PER_PAGE, workers)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+# Imported by the label sheet worker processes; keep it free of Django.
+
+QR_BOX_SIZE = 4
+QR_BORDER = 2
+
+
+def qr_payload(code: str, name: str, scan_url: str) -> str:
+    return f"{code} | {name} | {scan_url}"
+
+
+def make_qr_png(text: str) -> bytes:
+    import qrcode
+
+    qr = qrcode.QRCode(border=QR_BORDER, box_size=QR_BOX_SIZE)
+    qr.add_data(text)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def qr_digest(text: str) -> str:
+    # The rendering parameters are part of the key so that changing them
+    # never serves images produced with the old settings.
+    raw = f"{QR_BOX_SIZE}:{QR_BORDER}:{text}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cached_qr_png(text: str, cache_dir) -> bytes:
+    digest = qr_digest(text)
+    directory = Path(cache_dir) / digest[:2]
+    path = directory / f"{digest}.png"
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+    png = make_qr_png(text)
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as target:
+            target.write(png)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return png
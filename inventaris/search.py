@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import re
+from typing import Iterable
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Asset
+
+# The index lives outside the ORM: an FTS5 virtual table on SQLite and a
+# tsvector table with a GIN index on PostgreSQL (see migration 0010). Other
+# backends, or SQLite builds without FTS5, fall back to icontains filters.
+SEARCH_TABLE = "inventaris_asset_search"
+SEARCH_LIMIT = 20
+
+_SOURCE_SQL = """
+    SELECT a.id, a.code, a.name, c.code || ' ' || c.name, l.name
+    FROM inventaris_asset a
+    JOIN inventaris_category c ON c.id = a.category_id
+    JOIN inventaris_location l ON l.id = a.current_location_id
+    WHERE a.deleted_at IS NULL AND {where}
+"""
+
+_POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('simple', src.code), 'A')"
+    " || setweight(to_tsvector('simple', src.name), 'A')"
+    " || setweight(to_tsvector('simple', src.category), 'B')"
+    " || setweight(to_tsvector('simple', src.location), 'C')"
+)
+
+_available: dict[str, bool] = {}
+
+
+def backend() -> str | None:
+    vendor = connection.vendor
+    if vendor not in {"sqlite", "postgresql"}:
+        return None
+    key = f"{connection.alias}:{connection.settings_dict['NAME']}"
+    if key not in _available:
+        with connection.cursor() as cursor:
+            _available[key] = SEARCH_TABLE in connection.introspection.table_names(cursor)
+    return vendor if _available[key] else None
+
+
+def search_terms(query: str | None) -> list[str]:
+    return [term.lower() for term in re.findall(r"\w+", query or "")]
+
+
+def _match_expression(terms: list[str]) -> str:
+    if backend() == "postgresql":
+        return " & ".join(f"{term}:*" for term in terms)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _reindex(where: str, params: list):
+    vendor = backend()
+    if vendor is None:
+        return
+    assets = f"SELECT a.id FROM inventaris_asset a WHERE {where}"
+    source = _SOURCE_SQL.format(where=where)
+    with connection.cursor() as cursor:
+        if vendor == "sqlite":
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({assets})", params)
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, code, name, category, location) {source}",
+                params,
+            )
+        else:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE asset_id IN ({assets})", params)
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (asset_id, document)"
+                f" SELECT src.id, {_POSTGRES_DOCUMENT}"
+                f" FROM ({source}) AS src (id, code, name, category, location)",
+                params,
+            )
+
+
+def index_assets(asset_ids: Iterable[int]):
+    ids = list(asset_ids)
+    if ids:
+        _reindex(f"a.id IN ({', '.join(['%s'] * len(ids))})", ids)
+
+
+def index_category(category_id: int):
+    _reindex("a.category_id = %s", [category_id])
+
+
+def index_location(location_id: int):
+    _reindex("a.current_location_id = %s", [location_id])
+
+
+def remove_assets(asset_ids: Iterable[int]):
+    ids = list(asset_ids)
+    vendor = backend()
+    if not ids or vendor is None:
+        return
+    column = "rowid" if vendor == "sqlite" else "asset_id"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} WHERE {column} IN ({', '.join(['%s'] * len(ids))})",
+            ids,
+        )
+
+
+def filter_assets(queryset, query: str | None):
+    """Narrow an asset queryset to rows matching every term as a prefix."""
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+    vendor = backend()
+    if vendor == "sqlite":
+        sql = f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s"
+    elif vendor == "postgresql":
+        sql = f"SELECT asset_id FROM {SEARCH_TABLE} WHERE document @@ to_tsquery('simple', %s)"
+    else:
+        for term in terms:
+            queryset = queryset.filter(
+                Q(code__icontains=term)
+                | Q(name__icontains=term)
+                | Q(category__name__icontains=term)
+                | Q(category__code__icontains=term)
+                | Q(current_location__name__icontains=term)
+            )
+        return queryset
+    return queryset.filter(pk__in=RawSQL(sql, [_match_expression(terms)]))
+
+
+def ranked_asset_ids(query: str | None, limit: int = SEARCH_LIMIT) -> list[int]:
+    """Best matches first; code and name hits outrank category and location."""
+    terms = search_terms(query)
+    if not terms:
+        return []
+    vendor = backend()
+    if vendor == "sqlite":
+        sql = (
+            f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s"
+            f" ORDER BY bm25({SEARCH_TABLE}, 10.0, 5.0, 2.0, 1.0) LIMIT %s"
+        )
+    elif vendor == "postgresql":
+        sql = (
+            f"SELECT asset_id FROM {SEARCH_TABLE}, to_tsquery('simple', %s) query"
+            f" WHERE document @@ query ORDER BY ts_rank(document, query) DESC LIMIT %s"
+        )
+    else:
+        qs = filter_assets(Asset.objects.filter(deleted_at__isnull=True), query)
+        return list(qs.order_by("code").values_list("id", flat=True)[:limit])
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [_match_expression(terms), limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def rebuild_index():
+    vendor = backend()
+    if vendor is None:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    _reindex("1 = 1", [])
@@ -1,10 +1,27 @@
 from __future__ import annotations
 
-from django.db.models.signals import m2m_changed, post_save, pre_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from . import audit, due_state, meters, search, summary
 from .middleware import get_current_user
-from .models import Asset, AuditLog
+from .models import (
+    Asset,
+    AssetMeterReading,
+    AuditLog,
+    Category,
+    DataVersion,
+    Location,
+    Maintenance,
+    MaintenanceSchedule,
+)
+
+DATA_VERSION_NAMES = {
+    Asset: "asset",
+    Category: "category",
+    Location: "location",
+    Maintenance: "maintenance",
+}
 
 
 def _log_asset_change(asset: Asset, changes: dict[str, dict]):
@@ -14,12 +31,14 @@ def _log_asset_change(asset: Asset, changes: dict[str, dict]):
     performed_by = user if user and user.is_authenticated else asset.updated_by or asset.created_by
     if performed_by is None:
         return
-    AuditLog.objects.create(
-        entity="asset",
-        entity_id=asset.pk,
-        action="update",
-        changes=changes,
-        performed_by=performed_by,
+    audit.record(
+        AuditLog(
+            entity="asset",
+            entity_id=asset.pk,
+            action="update",
+            changes=changes,
+            performed_by=performed_by,
+        )
     )
 
 
@@ -28,11 +47,10 @@ def snapshot_asset(sender, instance: Asset, **kwargs):
     if not instance.pk:
         instance._pre_save_snapshot = None
         return
-    previous = Asset.objects.filter(pk=instance.pk).values(
-        "status",
-        "condition",
-        "current_location_id",
-    ).first()
+    previous = instance.loaded_values()
+    if previous is None:
+        # Only instances built by hand (not loaded from the DB) need the query.
+        previous = Asset.objects.filter(pk=instance.pk).values(*Asset.AUDITED_FIELDS).first()
     instance._pre_save_snapshot = previous
 
 
@@ -61,16 +79,29 @@ def audit_asset(sender, instance: Asset, created: bool, **kwargs):
 
 
 @receiver(m2m_changed, sender=Asset.responsible_users.through)
-def audit_asset_responsible(sender, instance: Asset, action: str, pk_set, **kwargs):
+def audit_asset_responsible(sender, instance: Asset, action: str, reverse: bool, pk_set, **kwargs):
+    if reverse:
+        return
     if action in {"pre_add", "pre_remove", "pre_clear"}:
-        instance._responsible_before = list(
-            instance.responsible_users.values_list("id", flat=True)
-        )
+        # Read the current ids only if this instance has not seen them yet: new
+        # assets start empty and every post_* below remembers the result, so
+        # set() (a remove followed by an add) reads at most once.
+        if instance.loaded_responsible_ids() is None:
+            instance.remember_responsible_ids(instance.responsible_users.values_list("id", flat=True))
         return
     if action not in {"post_add", "post_remove", "post_clear"}:
         return
-    before_ids = getattr(instance, "_responsible_before", [])
-    after_ids = list(instance.responsible_users.values_list("id", flat=True))
+    before_ids = instance.loaded_responsible_ids() or []
+    # pk_set holds the ids actually added/removed, so "after" needs no query.
+    if action == "post_add":
+        after_ids = before_ids + sorted(pk_set - set(before_ids))
+    elif action == "post_remove":
+        after_ids = [pk for pk in before_ids if pk not in pk_set]
+    else:
+        after_ids = []
+    instance.remember_responsible_ids(after_ids)
+    if after_ids == before_ids:
+        return
     changes = {
         "responsible_users": {
             "before": before_ids,
@@ -78,3 +109,65 @@ def audit_asset_responsible(sender, instance: Asset, action: str, pk_set, **kwar
         }
     }
     _log_asset_change(instance, changes)
+
+
+@receiver(post_save, sender=Asset)
+def index_asset(sender, instance: Asset, **kwargs):
+    # Soft-deleted assets drop out of the index here as well.
+    search.index_assets([instance.pk])
+
+
+@receiver(post_delete, sender=Asset)
+def unindex_asset(sender, instance: Asset, **kwargs):
+    search.remove_assets([instance.pk])
+
+
+@receiver(post_save, sender=Asset)
+def count_asset(sender, instance: Asset, created: bool, **kwargs):
+    previous = None if created else getattr(instance, "_pre_save_snapshot", None)
+    summary.record_change(previous and summary.summary_key(previous), summary.summary_key(instance))
+
+
+@receiver(post_delete, sender=Asset)
+def uncount_asset(sender, instance: Asset, **kwargs):
+    summary.record_change(summary.summary_key(instance), None)
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_assets(sender, instance: Category, created: bool, **kwargs):
+    if not created:
+        search.index_category(instance.pk)
+
+
+@receiver(post_save, sender=Location)
+def reindex_location_assets(sender, instance: Location, created: bool, **kwargs):
+    if not created:
+        search.index_location(instance.pk)
+
+
+@receiver(post_save, sender=MaintenanceSchedule)
+def refresh_schedule_due_state(sender, instance: MaintenanceSchedule, **kwargs):
+    due_state.refresh_schedules(MaintenanceSchedule.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=AssetMeterReading)
+def track_meter_reading(sender, instance: AssetMeterReading, created: bool, **kwargs):
+    if created:
+        meters.record_reading(instance)
+    else:
+        meters.recompute_latest(instance.asset_id, instance.reading_type)
+    due_state.refresh_for_readings(instance.asset_id, instance.reading_type)
+
+
+@receiver(post_delete, sender=AssetMeterReading)
+def untrack_meter_reading(sender, instance: AssetMeterReading, **kwargs):
+    meters.recompute_latest(instance.asset_id, instance.reading_type)
+    due_state.refresh_for_readings(instance.asset_id, instance.reading_type)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_data_version(sender, **kwargs):
+    name = DATA_VERSION_NAMES.get(sender)
+    if name:
+        DataVersion.bump_on_commit(name)
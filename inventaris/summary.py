@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import Asset, Category, InventorySummary, Location
+
+# A summary cell is identified by (category_id, location_id, status, condition).
+SummaryKey = tuple
+
+DIMENSIONS = {
+    "category": "Kategori",
+    "location": "Lokasi",
+    "status": "Status",
+    "condition": "Kondisi",
+}
+
+
+def summary_key(values) -> SummaryKey | None:
+    """Cell for an asset, or None when it should not be counted (soft-deleted)."""
+    if isinstance(values, dict):
+        if values.get("deleted_at"):
+            return None
+        return (
+            values["category_id"],
+            values["current_location_id"],
+            values["status"],
+            values["condition"],
+        )
+    if values.deleted_at:
+        return None
+    return (values.category_id, values.current_location_id, values.status, values.condition)
+
+
+def apply_deltas(deltas: Counter):
+    """Add ``deltas`` (cell -> +/-n) to the summary with one UPDATE per touched cell."""
+    for (category_id, location_id, status, condition), delta in deltas.items():
+        if not delta:
+            continue
+        cell = InventorySummary.objects.filter(
+            category_id=category_id,
+            location_id=location_id,
+            status=status,
+            condition=condition,
+        )
+        if delta < 0:
+            cell.filter(count__gte=-delta).update(count=F("count") + delta)
+            continue
+        if not cell.update(count=F("count") + delta):
+            obj, created = InventorySummary.objects.get_or_create(
+                category_id=category_id,
+                location_id=location_id,
+                status=status,
+                condition=condition,
+                defaults={"count": delta},
+            )
+            if not created:
+                cell.update(count=F("count") + delta)
+
+
+def record_change(before: SummaryKey | None, after: SummaryKey | None):
+    if before == after:
+        return
+    deltas: Counter = Counter()
+    if before is not None:
+        deltas[before] -= 1
+    if after is not None:
+        deltas[after] += 1
+    apply_deltas(deltas)
+
+
+def compute_cells() -> Counter:
+    grouped = (
+        Asset.objects.filter(deleted_at__isnull=True)
+        .order_by()
+        .values_list("category_id", "current_location_id", "status", "condition")
+        .annotate(total=Count("id"))
+    )
+    return Counter({tuple(row[:4]): row[4] for row in grouped})
+
+
+def rebuild() -> int:
+    """Recount from Asset and replace the summary; returns how many cells drifted."""
+    with transaction.atomic():
+        fresh = compute_cells()
+        stored = Counter(
+            {
+                tuple(row[:4]): row[4]
+                for row in InventorySummary.objects.filter(count__gt=0).values_list(
+                    "category_id", "location_id", "status", "condition", "count"
+                )
+            }
+        )
+        drift = sum(1 for key in fresh.keys() | stored.keys() if fresh[key] != stored[key])
+        InventorySummary.objects.all().delete()
+        InventorySummary.objects.bulk_create(
+            [
+                InventorySummary(
+                    category_id=category_id,
+                    location_id=location_id,
+                    status=status,
+                    condition=condition,
+                    count=count,
+                )
+                for (category_id, location_id, status, condition), count in fresh.items()
+            ],
+            batch_size=1000,
+        )
+    return drift
+
+
+def pivot(rows: str, cols: str, filters=None, level: int = 0) -> dict:
+    """Cross-tab summary cells by two dimensions.
+
+    Locations roll up to their ancestor at ``level`` (0 = top-level building),
+    so the work is proportional to the number of summary cells, not assets.
+    """
+    filters = filters or {}
+    qs = InventorySummary.objects.filter(count__gt=0)
+    if filters.get("category"):
+        qs = qs.filter(category_id=filters["category"])
+    if filters.get("status"):
+        qs = qs.filter(status=filters["status"])
+    if filters.get("condition"):
+        qs = qs.filter(condition=filters["condition"])
+    if filters.get("location"):
+        qs = qs.filter(Location.subtree_q_for(filters["location"], "location"))
+
+    locations = {
+        pk: (path, name) for pk, path, name in Location.objects.order_by().values_list("pk", "path", "name")
+    }
+
+    def location_at_level(location_id: int) -> int:
+        path = locations.get(location_id, ("", ""))[0]
+        lineage = [int(part) for part in path.split("/") if part] or [location_id]
+        return lineage[min(level, len(lineage) - 1)]
+
+    table: Counter = Counter()
+    for category_id, location_id, status, condition, count in qs.values_list(
+        "category_id", "location_id", "status", "condition", "count"
+    ):
+        cell = {
+            "category": category_id,
+            "location": location_at_level(location_id),
+            "status": status,
+            "condition": condition,
+        }
+        table[(cell[rows], cell[cols])] += count
+
+    labels = _labels(rows, {key[0] for key in table}, locations)
+    col_labels = _labels(cols, {key[1] for key in table}, locations)
+    row_keys = sorted(labels, key=lambda key: str(labels[key]))
+    col_keys = sorted(col_labels, key=lambda key: str(col_labels[key]))
+    return {
+        "rows": [
+            {
+                "label": labels[row],
+                "cells": [table[(row, col)] for col in col_keys],
+                "total": sum(table[(row, col)] for col in col_keys),
+            }
+            for row in row_keys
+        ],
+        "columns": [col_labels[col] for col in col_keys],
+        "column_totals": [sum(table[(row, col)] for row in row_keys) for col in col_keys],
+        "total": sum(table.values()),
+    }
+
+
+def _labels(dimension: str, keys: Iterable, locations: dict) -> dict:
+    keys = list(keys)
+    if dimension == "category":
+        names = dict(Category.objects.filter(pk__in=keys).values_list("pk", "name"))
+    elif dimension == "location":
+        names = {key: locations[key][1] for key in keys if key in locations}
+    elif dimension == "status":
+        names = dict(Asset.STATUS_CHOICES)
+    else:
+        names = dict(Asset.CONDITION_CHOICES)
+    return {key: names.get(key, key) for key in keys}
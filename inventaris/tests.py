@@ -0,0 +1,888 @@
+import gzip
+import json
+import tempfile
+from collections import Counter
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .exports import claim_next_export_job
+from . import audit_archive, summary, timetravel
+from .asset_moves import move_assets
+from .audit import audit_buffer, record
+from .models import (
+    Asset,
+    AssetCodeCounter,
+    AssetLocationHistory,
+    AssetResponsibility,
+    AssetStateCheckpoint,
+    AuditLog,
+    Category,
+    DataVersion,
+    ExportJob,
+    InventorySummary,
+    Location,
+    _code_pool,
+)
+from .pagination import KeysetPaginator, decode_cursor, encode_cursor, seek_q
+
+
+class AssetAuditSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("sarpras", password="pw")
+        cls.category = Category.objects.create(code="ELEK", name="Elektronik")
+        cls.location = Location.objects.create(name="Gedung A")
+        cls.asset = Asset.objects.create(
+            name="Laptop",
+            category=cls.category,
+            acquired_date=date(2025, 1, 5),
+            current_location=cls.location,
+            created_by=cls.user,
+            updated_by=cls.user,
+        )
+
+    def _save_status(self, asset, status):
+        """Save a status change and count the SELECTs it makes on the asset table."""
+        asset.status = status
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            asset.save(update_fields=["status", "updated_at"])
+        return sum(
+            1
+            for query in queries.captured_queries
+            if query["sql"].startswith("SELECT") and 'FROM "inventaris_asset" ' in query["sql"]
+        )
+
+    def test_loaded_asset_saves_without_snapshot_query(self):
+        loaded = Asset.objects.get(pk=self.asset.pk)
+        loaded_queries = self._save_status(loaded, Asset.STATUS_RUSAK)
+
+        unloaded = Asset(
+            pk=self.asset.pk,
+            code=self.asset.code,
+            name=self.asset.name,
+            category=self.category,
+            acquired_date=self.asset.acquired_date,
+            current_location=self.location,
+            created_by=self.user,
+            updated_by=self.user,
+        )
+        unloaded.status = Asset.STATUS_RUSAK
+        unloaded_queries = self._save_status(unloaded, Asset.STATUS_DIPINJAM)
+
+        self.assertEqual(loaded_queries, 0)
+        self.assertEqual(unloaded_queries, 1)
+        changes = list(
+            AuditLog.objects.filter(entity="asset", entity_id=self.asset.pk)
+            .order_by("id")
+            .values_list("changes", flat=True)
+        )
+        self.assertEqual(
+            changes,
+            [
+                {"status": {"before": Asset.STATUS_AKTIF, "after": Asset.STATUS_RUSAK}},
+                {"status": {"before": Asset.STATUS_RUSAK, "after": Asset.STATUS_DIPINJAM}},
+            ],
+        )
+
+    def test_repeated_saves_diff_against_last_written_values(self):
+        asset = Asset.objects.get(pk=self.asset.pk)
+        self._save_status(asset, Asset.STATUS_RUSAK)
+        self._save_status(asset, Asset.STATUS_AKTIF)
+        self.assertEqual(
+            list(
+                AuditLog.objects.filter(entity="asset", entity_id=asset.pk)
+                .order_by("id")
+                .values_list("changes", flat=True)
+            ),
+            [
+                {"status": {"before": Asset.STATUS_AKTIF, "after": Asset.STATUS_RUSAK}},
+                {"status": {"before": Asset.STATUS_RUSAK, "after": Asset.STATUS_AKTIF}},
+            ],
+        )
+
+
+class ExportJobClaimTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("admin", password="pw")
+
+    def _job(self, status, updated_ago):
+        job = ExportJob.objects.create(
+            report_type=ExportJob.REPORT_ASSET,
+            file_format=ExportJob.FORMAT_CSV,
+            status=status,
+            requested_by=self.user,
+        )
+        ExportJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - updated_ago)
+        return job
+
+    def test_running_job_is_reclaimed_only_after_going_silent(self):
+        with self.settings(EXPORT_JOB_STALE_AFTER=600):
+            self._job(ExportJob.STATUS_RUNNING, timedelta(seconds=60))
+            self.assertIsNone(claim_next_export_job())
+
+            stale = self._job(ExportJob.STATUS_RUNNING, timedelta(seconds=601))
+            claimed = claim_next_export_job()
+            self.assertEqual(claimed.pk, stale.pk)
+            self.assertEqual(claimed.status, ExportJob.STATUS_RUNNING)
+            # The claim refreshes updated_at, so a second worker does not take it too.
+            self.assertIsNone(claim_next_export_job())
+
+
+class DataVersionTests(TestCase):
+    def test_transaction_bumps_each_version_once_on_commit(self):
+        DataVersion.bump("asset")
+        with self.captureOnCommitCallbacks(execute=True):
+            for name in ("Meja", "Kursi", "Lemari"):
+                Category.objects.create(code=name[:4].upper(), name=name)
+            DataVersion.bump_on_commit("asset")
+            self.assertEqual(DataVersion.current("asset", "category"), {"asset": 1, "category": 0})
+        self.assertEqual(DataVersion.current("asset", "category"), {"asset": 2, "category": 1})
+
+    def test_rolled_back_savepoint_does_not_lose_later_bumps(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    DataVersion.bump_on_commit("asset")
+                    raise ValueError
+            except ValueError:
+                pass
+            DataVersion.bump_on_commit("location")
+        self.assertEqual(DataVersion.current("asset", "location"), {"asset": 0, "location": 1})
+
+
+class KeysetPaginatorTests(TestCase):
+    ordering = ("name", "-id")
+
+    @classmethod
+    def setUpTestData(cls):
+        # Repeated names make the "-id" tie-breaker do real work.
+        for index, name in enumerate(["B", "A", "C", "A", "B", "A", "C"]):
+            Category.objects.create(code=f"K{index}", name=name)
+        cls.expected = list(Category.objects.order_by(*cls.ordering).values_list("pk", flat=True))
+
+    def test_seek_q_mixes_directions(self):
+        first = Category.objects.order_by(*self.ordering).first()
+        after = Category.objects.filter(seek_q(self.ordering, [first.name, first.pk]))
+        before = Category.objects.filter(seek_q(self.ordering, [first.name, first.pk], forward=False))
+        self.assertEqual(sorted(after.values_list("pk", flat=True)), sorted(self.expected[1:]))
+        self.assertFalse(before.exists())
+
+    def test_cursor_keeps_microseconds(self):
+        moment = _at(2025, 3, 5, 10, 0, 0, 123456)
+        cursor = encode_cursor({"performed_at": moment, "id": 7}, ("-performed_at", "-id"), AuditLog)
+        self.assertEqual(decode_cursor(cursor, ("-performed_at", "-id"), AuditLog), [moment, 7])
+
+    def test_cursor_round_trip(self):
+        obj = Category.objects.order_by(*self.ordering).first()
+        cursor = encode_cursor(obj, self.ordering, Category)
+        self.assertEqual(decode_cursor(cursor, self.ordering, Category), [obj.name, obj.pk])
+        self.assertIsNone(decode_cursor("bukan-cursor", self.ordering, Category))
+        self.assertIsNone(decode_cursor(cursor, ("name",), Category))
+
+    def test_pages_forward_and_back_without_gaps(self):
+        paginator = KeysetPaginator(Category.objects.all(), self.ordering, per_page=2)
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(after=pages[-1].next_cursor))
+        self.assertEqual([obj.pk for page in pages for obj in page], self.expected)
+        self.assertFalse(pages[0].has_previous())
+
+        back = [pages[-1]]
+        while back[-1].has_previous():
+            back.append(paginator.page(before=back[-1].previous_cursor))
+        self.assertEqual(
+            [[obj.pk for obj in page] for page in reversed(back)],
+            [[obj.pk for obj in page] for page in pages],
+        )
+
+
+class InventorySummaryDeltaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("sarpras", password="pw")
+        cls.elektronik = Category.objects.create(code="ELEK", name="Elektronik")
+        cls.mebel = Category.objects.create(code="MEB", name="Mebel")
+        cls.location = Location.objects.create(name="Gedung A")
+
+    def _cells(self) -> dict:
+        return {
+            tuple(row[:4]): row[4]
+            for row in InventorySummary.objects.filter(count__gt=0).values_list(
+                "category_id", "location_id", "status", "condition", "count"
+            )
+        }
+
+    def test_saves_move_counts_between_cells(self):
+        assets = [
+            Asset.objects.create(
+                name=f"Laptop {index}",
+                category=self.elektronik,
+                acquired_date=date(2025, 1, 5),
+                current_location=self.location,
+                created_by=self.user,
+                updated_by=self.user,
+            )
+            for index in range(2)
+        ]
+        aktif = (self.elektronik.pk, self.location.pk, Asset.STATUS_AKTIF, Asset.CONDITION_BAIK)
+        self.assertEqual(self._cells(), {aktif: 2})
+
+        asset = Asset.objects.get(pk=assets[0].pk)
+        asset.status = Asset.STATUS_RUSAK
+        asset.save()
+        rusak = (self.elektronik.pk, self.location.pk, Asset.STATUS_RUSAK, Asset.CONDITION_BAIK)
+        self.assertEqual(self._cells(), {aktif: 1, rusak: 1})
+
+        asset.category = self.mebel
+        asset.save()
+        mebel = (self.mebel.pk, self.location.pk, Asset.STATUS_RUSAK, Asset.CONDITION_BAIK)
+        self.assertEqual(self._cells(), {aktif: 1, mebel: 1})
+
+        asset.deleted_at = timezone.now()
+        asset.save()
+        self.assertEqual(self._cells(), {aktif: 1})
+
+        Asset.objects.get(pk=assets[1].pk).delete()
+        self.assertEqual(self._cells(), {})
+        self.assertEqual(summary.rebuild(), 0)
+
+    def test_negative_delta_never_goes_below_zero(self):
+        cell = (self.elektronik.pk, self.location.pk, Asset.STATUS_AKTIF, Asset.CONDITION_BAIK)
+        summary.apply_deltas(Counter({cell: 1}))
+        summary.apply_deltas(Counter({cell: -2}))
+        self.assertEqual(self._cells(), {cell: 1})
+
+
+class LocationMoveTests(TestCase):
+    def _location(self, pk, name, parent=None):
+        return Location.objects.create(pk=pk, name=name, parent=parent)
+
+    def test_move_rewrites_subtree_in_one_update(self):
+        gedung = self._location(1, "Gedung A")
+        lantai = self._location(3, "Lantai 1", gedung)
+        self._location(4, "Ruang 101", lantai)
+        # Same leading digit as "1": must not be caught by the prefix match.
+        gudang = self._location(10, "Gudang")
+        self._location(11, "Rak 1", gudang)
+        kampus = self._location(20, "Kampus")
+
+        gedung = Location.objects.get(pk=1)
+        with CaptureQueriesContext(connection) as queries:
+            gedung.move_to(kampus)
+        updates = [query for query in queries.captured_queries if query["sql"].startswith("UPDATE")]
+        # One for the moved row itself, one for all of its descendants.
+        self.assertEqual(len(updates), 2)
+
+        self.assertEqual(
+            dict(Location.objects.values_list("pk", "path")),
+            {1: "20/1", 3: "20/1/3", 4: "20/1/3/4", 10: "10", 11: "10/11", 20: "20"},
+        )
+        self.assertEqual(
+            dict(Location.objects.values_list("pk", "level")),
+            {1: 1, 3: 2, 4: 3, 10: 0, 11: 1, 20: 0},
+        )
+
+    def test_cannot_move_into_own_subtree(self):
+        gedung = self._location(1, "Gedung A")
+        lantai = self._location(3, "Lantai 1", gedung)
+        gedung = Location.objects.get(pk=1)
+        with self.assertRaises(ValueError):
+            gedung.move_to(lantai)
+
+
+class MeterReadingImportViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin", password="pw")
+
+    def _post(self, name, content):
+        self.client.force_login(self.user)
+        return self.client.post(
+            reverse("inventaris:meter_reading_import"),
+            {"file": SimpleUploadedFile(name, content)},
+        )
+
+    def test_unreadable_uploads_are_form_errors(self):
+        cases = [
+            ("readings.csv", "code,reading_type\nAST-é,KM\n".encode("latin-1"), "UTF-8"),
+            ("readings.json", b'[{"code": "A"}, {"code": ', "item ke-2"),
+            ("readings.json", b'[{"code": "A"}', "tidak ditutup"),
+        ]
+        for name, content, message in cases:
+            with self.subTest(content=content):
+                response = self._post(name, content)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(message, " ".join(response.context["form"].errors["file"]))
+                self.assertIsNone(response.context["result"])
+
+    def test_json_array_items_are_validated_one_by_one(self):
+        response = self._post("readings.json", b'[{"code": "TIDAK-ADA"}, 5]')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["result"]["error_count"], 2)
+
+
+class AssetCodeCounterTests(TestCase):
+    def setUp(self):
+        _code_pool.clear()
+        self.addCleanup(_code_pool.clear)
+
+    def test_ranges_are_contiguous_and_disjoint(self):
+        ranges = [AssetCodeCounter.reserve_range(2025, 1, count) for count in (3, 1, 5, 2)]
+        self.assertEqual(ranges, [(1, 3), (4, 4), (5, 9), (10, 11)])
+        # Other months keep their own counter.
+        self.assertEqual(AssetCodeCounter.reserve_range(2025, 2, 2), (1, 2))
+        self.assertEqual(
+            AssetCodeCounter.reserve_codes(2025, 1, 2), ["2025-01-0012", "2025-01-0013"]
+        )
+        self.assertEqual(AssetCodeCounter.reserve_codes(2025, 1, 0), [])
+        with self.assertRaises(ValueError):
+            AssetCodeCounter.reserve_range(2025, 1, 0)
+
+    def _counter_updates(self, queries) -> int:
+        return sum(
+            1
+            for query in queries.captured_queries
+            if query["sql"].startswith('UPDATE "inventaris_assetcodecounter"')
+        )
+
+    def test_transaction_draws_from_its_own_block(self):
+        acquired = date(2025, 3, 1)
+        with self.settings(ASSET_CODE_BLOCK_SIZE=5):
+            with self.captureOnCommitCallbacks(execute=True):
+                with CaptureQueriesContext(connection) as queries:
+                    inside = [AssetCodeCounter.next_code(acquired) for _ in range(4)]
+                self.assertEqual(self._counter_updates(queries), 1)
+            # The rest of the block is shared after commit, then a new one is reserved.
+            following = [AssetCodeCounter.next_code(acquired) for _ in range(3)]
+        codes = inside + following
+        self.assertEqual(
+            [int(code.rsplit("-", 1)[1]) for code in codes], [1, 2, 3, 4, 5, 6, 7]
+        )
+
+    def test_block_reserved_in_rolled_back_savepoint_is_dropped(self):
+        acquired = date(2025, 5, 1)
+        with self.settings(ASSET_CODE_BLOCK_SIZE=3):
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        self.assertEqual(AssetCodeCounter.next_code(acquired), "2025-05-0001")
+                        raise ValueError
+                except ValueError:
+                    pass
+                # Numbers 2..3 were never committed; a fresh block starts at 1 again.
+                codes = [AssetCodeCounter.next_code(acquired) for _ in range(2)]
+        self.assertEqual(codes, ["2025-05-0001", "2025-05-0002"])
+
+    def test_rolled_back_block_is_not_reused(self):
+        acquired = date(2025, 4, 1)
+        with self.settings(ASSET_CODE_BLOCK_SIZE=3):
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        AssetCodeCounter.next_code(acquired)
+                        raise ValueError
+                except ValueError:
+                    pass
+            # The counter update was rolled back too, so numbering restarts at 1.
+            self.assertEqual(AssetCodeCounter.next_code(acquired), "2025-04-0001")
+
+
+class AuditBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("sarpras", password="pw")
+        cls.other = get_user_model().objects.create_user("guru", password="pw")
+        cls.third = get_user_model().objects.create_user("tu", password="pw")
+        category = Category.objects.create(code="ELEK", name="Elektronik")
+        location = Location.objects.create(name="Gedung A")
+        cls.assets = [
+            Asset.objects.create(
+                name=f"Laptop {index}",
+                category=category,
+                acquired_date=date(2025, 1, 5),
+                current_location=location,
+                created_by=cls.user,
+                updated_by=cls.user,
+            )
+            for index in range(3)
+        ]
+
+    def _change_all(self):
+        for asset in Asset.objects.filter(pk__in=[asset.pk for asset in self.assets]):
+            asset.status = Asset.STATUS_RUSAK
+            asset.save()
+
+    def _audit_inserts(self, queries) -> int:
+        return sum(
+            1 for query in queries.captured_queries if query["sql"].startswith('INSERT INTO "inventaris_auditlog"')
+        )
+
+    def test_buffered_changes_are_written_with_one_insert_on_commit(self):
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                with audit_buffer():
+                    self._change_all()
+                self.assertEqual(AuditLog.objects.count(), 0)
+        self.assertEqual(self._audit_inserts(queries), 1)
+        self.assertEqual(AuditLog.objects.filter(entity="asset").count(), 3)
+
+    def test_rolled_back_changes_leave_no_entries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with audit_buffer():
+                try:
+                    with transaction.atomic():
+                        self._change_all()
+                        raise ValueError
+                except ValueError:
+                    pass
+        self.assertFalse(AuditLog.objects.exists())
+
+    def test_nested_buffers_flush_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                with audit_buffer() as outer:
+                    with audit_buffer() as inner:
+                        self.assertIs(inner, outer)
+                        self._change_all()
+                    self._change_all()
+        self.assertEqual(self._audit_inserts(queries), 1)
+        # The second pass changes nothing, so only the first is logged.
+        self.assertEqual(AuditLog.objects.count(), 3)
+
+    def _responsible_id_reads(self, queries) -> int:
+        # Reads of an asset's current responsible user ids (set() makes one itself).
+        return sum(
+            1
+            for query in queries.captured_queries
+            if query["sql"].startswith(
+                'SELECT "auth_user"."id" FROM "auth_user" INNER JOIN "inventaris_assetresponsibility"'
+            )
+        )
+
+    def test_responsible_changes_read_current_ids_at_most_once(self):
+        asset = self.assets[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                # Just created: known to have no responsible users yet.
+                asset.responsible_users.set([self.user, self.other])
+            # Only set()'s own read; the audit receiver adds none.
+            self.assertEqual(self._responsible_id_reads(queries), 1)
+
+            loaded = Asset.objects.get(pk=asset.pk)
+            with CaptureQueriesContext(connection) as queries:
+                loaded.responsible_users.set([self.other, self.third])
+            self.assertEqual(self._responsible_id_reads(queries), 2)
+
+        changes = [
+            entry["responsible_users"]
+            for entry in AuditLog.objects.filter(entity_id=asset.pk).order_by("id").values_list("changes", flat=True)
+        ]
+        self.assertEqual(
+            changes,
+            [
+                {"before": [], "after": [self.user.pk, self.other.pk]},
+                {"before": [self.user.pk, self.other.pk], "after": [self.other.pk]},
+                {"before": [self.other.pk], "after": [self.other.pk, self.third.pk]},
+            ],
+        )
+
+
+class ArchiveDirMixin:
+    """Points AUDIT_ARCHIVE_DIR at a fresh temporary directory for each test."""
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.archive_dir = Path(tmp.name)
+        override = self.settings(AUDIT_ARCHIVE_DIR=self.archive_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _log(self, performed_at, entity="asset", entity_id=1, action="update", changes=None):
+        return AuditLog.objects.create(
+            entity=entity,
+            entity_id=entity_id,
+            action=action,
+            changes=changes or {},
+            performed_by=self.user,
+            performed_at=performed_at,
+        )
+
+
+def _at(*args) -> datetime:
+    return timezone.make_aware(datetime(*args))
+
+
+class AuditArchiveTests(ArchiveDirMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("admin", password="pw")
+
+    def setUp(self):
+        super().setUp()
+        self.january = [self._log(_at(2025, 1, 10)), self._log(_at(2025, 1, 20), entity="maintenance", entity_id=7)]
+        self.february = [self._log(_at(2025, 2, 3), entity_id=2), self._log(_at(2025, 2, 4), action="delete")]
+        self.april = self._log(_at(2025, 4, 1))
+
+    def test_archive_writes_segments_and_deletes_only_archived_rows(self):
+        self.assertEqual(audit_archive.archive_before(_at(2025, 3, 1)), (4, 4))
+        self.assertEqual(list(AuditLog.objects.values_list("pk", flat=True)), [self.april.pk])
+
+        index = json.loads((self.archive_dir / audit_archive.INDEX_NAME).read_text())["segments"]
+        self.assertEqual([segment["count"] for segment in index], [2, 2])
+        self.assertTrue(all(segment["purged"] for segment in index))
+        january, february = index
+        self.assertEqual(january["entity_ids"], {"asset": [[1, 1]], "maintenance": [[7, 7]]})
+        self.assertEqual(
+            february["groups"],
+            [["asset", "delete", self.user.pk, 1], ["asset", "update", self.user.pk, 1]],
+        )
+        with gzip.open(self.archive_dir / february["file"], "rt", encoding="utf-8") as fileobj:
+            self.assertEqual(
+                [json.loads(line)["id"] for line in fileobj], [entry.pk for entry in self.february]
+            )
+
+        archived = [entry.id for entry in audit_archive.iter_archived()]
+        self.assertEqual(archived, [entry.pk for entry in reversed(self.january + self.february)])
+        self.assertEqual(audit_archive.archived_count({"entity": "asset"}), 3)
+
+    def test_rerun_after_interrupted_purge_deletes_without_archiving_again(self):
+        with mock.patch.object(audit_archive, "_purge", return_value=0):
+            self.assertEqual(audit_archive.archive_before(_at(2025, 3, 1)), (4, 0))
+        self.assertEqual(AuditLog.objects.count(), 5)
+        index = json.loads((self.archive_dir / audit_archive.INDEX_NAME).read_text())["segments"]
+        self.assertFalse(any(segment["purged"] for segment in index))
+
+        self.assertEqual(audit_archive.archive_before(_at(2025, 3, 1)), (0, 4))
+        self.assertEqual(list(AuditLog.objects.values_list("pk", flat=True)), [self.april.pk])
+        index = json.loads((self.archive_dir / audit_archive.INDEX_NAME).read_text())["segments"]
+        self.assertEqual([segment["count"] for segment in index], [2, 2])
+        self.assertTrue(all(segment["purged"] for segment in index))
+        self.assertEqual(len(list(self.archive_dir.glob("*.jsonl.gz"))), 2)
+
+
+    def test_months_are_split_into_bounded_segments(self):
+        for hour in range(5):
+            self._log(_at(2025, 1, 25, hour))
+        with mock.patch.object(audit_archive, "SEGMENT_MAX_ENTRIES", 2):
+            self.assertEqual(audit_archive.archive_before(_at(2025, 3, 1)), (9, 9))
+        index = audit_archive.load_index()
+        self.assertEqual(sorted(segment["count"] for segment in index), [1, 2, 2, 2, 2])
+        self.assertTrue(all(segment["count"] <= 2 for segment in index))
+
+        # A deep page only opens the segments around its cursor.
+        newest = list(audit_archive.iter_archived())
+        cursor = (newest[5].performed_at, newest[5].id)
+        with mock.patch.object(audit_archive, "_read_segment", wraps=audit_archive._read_segment) as read:
+            page = audit_archive.archived_page({}, cursor, 2)
+        self.assertEqual([entry.id for entry in page], [entry.id for entry in newest[6:8]])
+        self.assertLessEqual(read.call_count, 2)
+
+
+class AuditKeysetPaginatorTests(ArchiveDirMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("admin", password="pw")
+
+    def setUp(self):
+        super().setUp()
+        for day in range(1, 5):
+            self._log(_at(2025, 1, day), entity="asset" if day % 2 else "location")
+        # Same timestamp twice: the id tie-breaker has to hold across the boundary too.
+        self._log(_at(2025, 1, 4))
+        audit_archive.archive_before(_at(2025, 2, 1))
+        for day in range(1, 4):
+            self._log(_at(2025, 3, day), entity="asset" if day % 2 else "location")
+        self.expected = [
+            (entry.performed_at, entry.id)
+            for entry in sorted(
+                list(AuditLog.objects.all()) + list(audit_archive.iter_archived()),
+                key=lambda entry: (entry.performed_at, entry.id),
+                reverse=True,
+            )
+        ]
+
+    def _walk(self, filters: dict, per_page: int):
+        paginator = audit_archive.AuditKeysetPaginator(
+            AuditLog.objects.filter(**filters), per_page, filters
+        )
+        # A broken cursor can page in circles; stop well past the real page count.
+        limit = len(self.expected) + 2
+        pages = [paginator.page()]
+        while pages[-1].has_next() and len(pages) < limit:
+            pages.append(paginator.page(after=pages[-1].next_cursor))
+        back = [pages[-1]]
+        while back[-1].has_previous() and len(back) < limit:
+            back.append(paginator.page(before=back[-1].previous_cursor))
+        keys = lambda page: [(entry.performed_at, entry.id) for entry in page]  # noqa: E731
+        return [keys(page) for page in pages], [keys(page) for page in reversed(back)]
+
+    def test_pages_cross_into_the_archive_and_back(self):
+        for per_page in (2, 3, 10):
+            with self.subTest(per_page=per_page):
+                forward, backward = self._walk({}, per_page)
+                self.assertEqual([key for page in forward for key in page], self.expected)
+                self.assertEqual(backward, forward)
+
+    def test_rows_in_the_same_millisecond_are_not_skipped(self):
+        # Bulk moves and buffered flushes write many rows within one millisecond.
+        base = _at(2025, 3, 5, 10, 0, 0, 123000)
+        for offset in (100, 200, 300, 400):
+            self._log(base + timedelta(microseconds=offset))
+        self._log(base, entity_id=2)
+        self._log(base, entity_id=3)
+        self.expected = sorted(
+            [(entry.performed_at, entry.id) for entry in AuditLog.objects.all()]
+            + [(entry.performed_at, entry.id) for entry in audit_archive.iter_archived()],
+            reverse=True,
+        )
+        for per_page in (1, 2, 4):
+            with self.subTest(per_page=per_page):
+                forward, backward = self._walk({}, per_page)
+                self.assertEqual([key for page in forward for key in page], self.expected)
+                self.assertEqual(backward, forward)
+
+    def test_filters_apply_on_both_sides(self):
+        forward, backward = self._walk({"entity": "asset"}, 2)
+        expected = [
+            (entry.performed_at, entry.id)
+            for entry in sorted(
+                list(AuditLog.objects.filter(entity="asset"))
+                + list(audit_archive.iter_archived({"entity": "asset"})),
+                key=lambda entry: (entry.performed_at, entry.id),
+                reverse=True,
+            )
+        ]
+        self.assertEqual([key for page in forward for key in page], expected)
+        self.assertEqual(backward, forward)
+
+    def test_filter_choices_pick_up_new_values(self):
+        audit_archive.forget_filter_choices()
+        self.assertNotIn("restore", audit_archive.filter_choices()["action"])
+        with self.captureOnCommitCallbacks(execute=True):
+            record(
+                AuditLog(entity="asset", entity_id=1, action="restore", changes={}, performed_by=self.user)
+            )
+        self.assertIn("restore", audit_archive.filter_choices()["action"])
+
+    def test_count_with_entity_id_uses_the_index_only(self):
+        with mock.patch.object(audit_archive, "_read_segment", side_effect=AssertionError):
+            self.assertEqual(audit_archive.archived_count({"entity": "asset", "entity_id": 1}), 3)
+            self.assertEqual(audit_archive.archived_count({"entity": "asset", "entity_id": 99}), 0)
+
+
+class TimeTravelTests(ArchiveDirMixin, TestCase):
+    """A short, consistent history for two assets; see setUp for the timeline."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("sarpras", password="pw")
+        cls.category = Category.objects.create(code="ELEK", name="Elektronik")
+        cls.gedung, cls.lab, cls.gudang = (
+            Location.objects.create(name=name) for name in ("Gedung A", "Lab", "Gudang")
+        )
+
+    def _asset(self, name, created_at, **current):
+        asset = Asset.objects.create(
+            name=name,
+            category=self.category,
+            acquired_date=created_at.date(),
+            current_location=self.gedung,
+            created_by=self.user,
+            updated_by=self.user,
+        )
+        Asset.objects.filter(pk=asset.pk).update(created_at=created_at, **current)
+        return asset.pk
+
+    def _move(self, asset_id, moved_at, from_location, to_location):
+        AssetLocationHistory.objects.create(
+            asset_id=asset_id,
+            from_location=from_location,
+            to_location=to_location,
+            moved_by=self.user,
+            moved_at=moved_at,
+        )
+
+    def setUp(self):
+        super().setUp()
+        # Laptop: created 1 Jan in Gedung A, broken 10 Jan (archived), moved to
+        # Lab 5 Feb, handed to the user 1 Mar, checkpoint 15 Mar, repaired but
+        # scratched 2 Apr, moved to Gudang 1 May, deleted 1 Jun.
+        self.laptop = self._asset(
+            "Laptop",
+            _at(2025, 1, 1, 10),
+            status=Asset.STATUS_AKTIF,
+            condition=Asset.CONDITION_RUSAK_RINGAN,
+            current_location=self.gudang,
+            deleted_at=_at(2025, 6, 1, 9),
+        )
+        # Proyektor: created 20 Mar in Gedung A, moved to Lab 10 Apr.
+        self.proyektor = self._asset("Proyektor", _at(2025, 3, 20, 8), current_location=self.lab)
+        AuditLog.objects.all().delete()
+        AssetLocationHistory.objects.all().delete()
+
+        AssetResponsibility.objects.create(asset_id=self.laptop, user=self.user)
+        self._log(
+            _at(2025, 1, 10, 9),
+            entity_id=self.laptop,
+            changes={"status": {"before": Asset.STATUS_AKTIF, "after": Asset.STATUS_RUSAK}},
+        )
+        audit_archive.archive_before(_at(2025, 2, 1))
+        self._move(self.laptop, _at(2025, 1, 1, 10), None, self.gedung)
+        self._move(self.laptop, _at(2025, 2, 5, 12), self.gedung, self.lab)
+        self._log(
+            _at(2025, 3, 1, 8),
+            entity_id=self.laptop,
+            changes={"responsible_users": {"before": [], "after": [self.user.pk]}},
+        )
+        AssetStateCheckpoint.objects.create(
+            asset_id=self.laptop,
+            taken_at=_at(2025, 3, 15),
+            status=Asset.STATUS_RUSAK,
+            condition=Asset.CONDITION_BAIK,
+            location=self.lab,
+            responsible_user_ids=[self.user.pk],
+        )
+        self._log(
+            _at(2025, 4, 2, 14),
+            entity_id=self.laptop,
+            changes={
+                "status": {"before": Asset.STATUS_RUSAK, "after": Asset.STATUS_AKTIF},
+                "condition": {"before": Asset.CONDITION_BAIK, "after": Asset.CONDITION_RUSAK_RINGAN},
+            },
+        )
+        self._move(self.proyektor, _at(2025, 4, 10, 9), self.gedung, self.lab)
+        self._move(self.laptop, _at(2025, 5, 1, 9), self.lab, self.gudang)
+
+    def _state(self, asset_id, status, condition, location, responsible, deleted=False):
+        return timetravel.AssetState(asset_id, status, condition, location.pk, responsible, deleted)
+
+    def test_asset_and_inventory_reconstructions_agree(self):
+        aktif, rusak = Asset.STATUS_AKTIF, Asset.STATUS_RUSAK
+        baik, ringan = Asset.CONDITION_BAIK, Asset.CONDITION_RUSAK_RINGAN
+        user = [self.user.pk]
+        laptop = self.laptop
+        proyektor = self.proyektor
+        expected = {
+            # Only the archived segment knows about the 10 Jan breakdown.
+            date(2025, 1, 5): {laptop: self._state(laptop, aktif, baik, self.gedung, [])},
+            date(2025, 1, 31): {laptop: self._state(laptop, rusak, baik, self.gedung, [])},
+            # A date means the end of that day, so the 12:00 move counts.
+            date(2025, 2, 5): {laptop: self._state(laptop, rusak, baik, self.lab, [])},
+            # Before the checkpoint: replayed back from it.
+            date(2025, 3, 10): {laptop: self._state(laptop, rusak, baik, self.lab, user)},
+            # After it: the laptop still uses it, the proyektor starts from its row.
+            date(2025, 3, 31): {
+                laptop: self._state(laptop, rusak, baik, self.lab, user),
+                proyektor: self._state(proyektor, aktif, baik, self.gedung, []),
+            },
+            date(2025, 4, 15): {
+                laptop: self._state(laptop, aktif, ringan, self.lab, user),
+                proyektor: self._state(proyektor, aktif, baik, self.lab, []),
+            },
+            date(2025, 6, 1): {
+                laptop: self._state(laptop, aktif, ringan, self.gudang, user, deleted=True),
+                proyektor: self._state(proyektor, aktif, baik, self.lab, []),
+            },
+        }
+        for day, states in expected.items():
+            with self.subTest(day=day):
+                inventory = timetravel.inventory_state_at(day, include_deleted=True)
+                self.assertEqual(inventory, states)
+                for asset_id in (laptop, proyektor):
+                    self.assertEqual(timetravel.asset_state_at(asset_id, day), states.get(asset_id))
+
+    def test_move_through_the_edit_form_is_replayed(self):
+        admin = get_user_model().objects.create_superuser("admin", password="pw")
+        asset = Asset.objects.get(pk=self.proyektor)
+        before_edit = timezone.now()
+        self.client.force_login(admin)
+        response = self.client.post(
+            reverse("inventaris:asset_update", kwargs={"pk": asset.pk}),
+            {
+                "name": asset.name,
+                "category": asset.category_id,
+                "acquired_date": asset.acquired_date.isoformat(),
+                "status": asset.status,
+                "condition": asset.condition,
+                "current_location": self.gudang.pk,
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        history = AssetLocationHistory.objects.filter(asset_id=asset.pk).latest("moved_at")
+        self.assertEqual((history.from_location_id, history.to_location_id), (self.lab.pk, self.gudang.pk))
+        self.assertEqual(timetravel.asset_state_at(asset.pk, before_edit).location_id, self.lab.pk)
+        self.assertEqual(timetravel.asset_state_at(asset.pk, timezone.now()).location_id, self.gudang.pk)
+
+    def test_created_and_deleted_edges(self):
+        self.assertIsNone(timetravel.asset_state_at(self.laptop, date(2024, 12, 31)))
+        self.assertEqual(timetravel.inventory_state_at(date(2024, 12, 31)), {})
+        # Registered at 10:00 on 1 Jan: present on that date, absent just before.
+        self.assertIsNotNone(timetravel.asset_state_at(self.laptop, date(2025, 1, 1)))
+        self.assertIsNone(timetravel.asset_state_at(self.laptop, _at(2025, 1, 1, 9, 59)))
+
+        self.assertFalse(timetravel.asset_state_at(self.laptop, _at(2025, 6, 1, 8, 59)).deleted)
+        self.assertTrue(timetravel.asset_state_at(self.laptop, _at(2025, 6, 1, 9)).deleted)
+        self.assertIn(self.laptop, timetravel.inventory_state_at(date(2025, 5, 31)))
+        self.assertNotIn(self.laptop, timetravel.inventory_state_at(date(2025, 6, 1)))
+
+    def test_checkpoint_bounds_the_replay(self):
+        # Make the checkpoint disagree with the log: it must win for dates up to
+        # its taken_at, and changes after it must not be undone on top of it.
+        AssetStateCheckpoint.objects.filter(asset_id=self.laptop).update(
+            condition=Asset.CONDITION_RUSAK_BERAT
+        )
+        for day in (date(2025, 3, 10), date(2025, 3, 14)):
+            with self.subTest(day=day):
+                self.assertEqual(
+                    timetravel.asset_state_at(self.laptop, day).condition, Asset.CONDITION_RUSAK_BERAT
+                )
+                self.assertEqual(
+                    timetravel.inventory_state_at(day)[self.laptop].condition,
+                    Asset.CONDITION_RUSAK_BERAT,
+                )
+        # After the checkpoint the current row is replayed instead.
+        self.assertEqual(
+            timetravel.asset_state_at(self.laptop, date(2025, 3, 20)).condition, Asset.CONDITION_BAIK
+        )
+
+    def test_as_moment(self):
+        self.assertEqual(timetravel.as_moment(date(2025, 2, 5)), _at(2025, 2, 5, 23, 59, 59, 999999))
+        self.assertEqual(timetravel.as_moment(datetime(2025, 2, 5, 12)), _at(2025, 2, 5, 12))
+        aware = _at(2025, 2, 5, 12)
+        self.assertIs(timetravel.as_moment(aware), aware)
+        with self.assertRaises(TypeError):
+            timetravel.as_moment("2025-02-05")
+
+
+class MoveAssetsTests(TestCase):
+    def test_back_dated_move_uses_one_timestamp_for_history_and_audit(self):
+        user = get_user_model().objects.create_user("sarpras", password="pw")
+        category = Category.objects.create(code="ELEK", name="Elektronik")
+        gedung = Location.objects.create(name="Gedung A")
+        lab = Location.objects.create(name="Lab")
+        asset = Asset.objects.create(
+            name="Laptop",
+            category=category,
+            acquired_date=date(2025, 1, 5),
+            current_location=gedung,
+            created_by=user,
+            updated_by=user,
+        )
+        moved_at = timezone.now() - timedelta(days=3)
+        self.assertEqual(move_assets([asset.pk], lab, user, moved_at=moved_at), 1)
+        self.assertEqual(AssetLocationHistory.objects.get(asset=asset, to_location=lab).moved_at, moved_at)
+        self.assertEqual(
+            AuditLog.objects.get(entity="asset", entity_id=asset.pk, changes__has_key="current_location").performed_at,
+            moved_at,
+        )
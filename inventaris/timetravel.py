@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, time
+
+from django.db.models import Min
+from django.utils import timezone
+
+from .audit_archive import iter_archived
+from .models import Asset, AssetLocationHistory, AssetResponsibility, AssetStateCheckpoint, AuditLog
+
+CHECKPOINT_BATCH_SIZE = 1000
+# Above this many assets, load every current row instead of an IN (...) list.
+CURRENT_STATE_IN_LIMIT = 500
+
+# Location comes from AssetLocationHistory (every move writes a row there), so
+# only these audited changes are replayed from AuditLog.
+AUDIT_FIELDS = {"status": "status", "condition": "condition", "responsible_users": "responsible_user_ids"}
+
+
+@dataclass
+class AssetState:
+    asset_id: int
+    status: str
+    condition: str
+    location_id: int | None
+    responsible_user_ids: list[int] = field(default_factory=list)
+    deleted: bool = False
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def as_moment(value) -> datetime:
+    """A date means the end of that day; naive datetimes use the current time zone."""
+    if isinstance(value, datetime):
+        return value if timezone.is_aware(value) else timezone.make_aware(value)
+    if isinstance(value, date):
+        return timezone.make_aware(datetime.combine(value, time.max))
+    raise TypeError("at must be a date or datetime")
+
+
+def _responsible_ids(asset_ids=None) -> dict[int, list[int]]:
+    qs = AssetResponsibility.objects.order_by("asset_id", "id")
+    if asset_ids is not None:
+        qs = qs.filter(asset_id__in=asset_ids)
+    result: dict[int, list[int]] = defaultdict(list)
+    for asset_id, user_id in qs.values_list("asset_id", "user_id").iterator():
+        result[asset_id].append(user_id)
+    return result
+
+
+def current_states(asset_ids=None) -> dict[int, AssetState]:
+    qs = Asset.objects.order_by()
+    if asset_ids is not None:
+        qs = qs.filter(pk__in=asset_ids)
+    responsible = _responsible_ids(asset_ids)
+    return {
+        pk: AssetState(pk, status, condition, location_id, responsible.get(pk, []), deleted_at is not None)
+        for pk, status, condition, location_id, deleted_at in qs.values_list(
+            "pk", "status", "condition", "current_location_id", "deleted_at"
+        ).iterator()
+    }
+
+
+def take_checkpoints(taken_at: datetime | None = None) -> int:
+    """Store the current state of every asset; later reconstructions replay from here."""
+    taken_at = taken_at or timezone.now()
+    checkpoints = [
+        AssetStateCheckpoint(
+            asset_id=state.asset_id,
+            taken_at=taken_at,
+            status=state.status,
+            condition=state.condition,
+            location_id=state.location_id,
+            responsible_user_ids=state.responsible_user_ids,
+        )
+        for state in current_states().values()
+    ]
+    AssetStateCheckpoint.objects.bulk_create(checkpoints, batch_size=CHECKPOINT_BATCH_SIZE)
+    return len(checkpoints)
+
+
+def _checkpoint_state(checkpoint: dict) -> AssetState:
+    return AssetState(
+        checkpoint["asset_id"],
+        checkpoint["status"],
+        checkpoint["condition"],
+        checkpoint["location_id"],
+        list(checkpoint["responsible_user_ids"]),
+    )
+
+
+def _replay(states: dict[int, AssetState], upper: dict[int, datetime], at: datetime, asset_ids=None):
+    """Undo every change after ``at`` (and up to each asset's checkpoint), newest first."""
+    audit = AuditLog.objects.filter(entity="asset", performed_at__gt=at)
+    history = AssetLocationHistory.objects.filter(moved_at__gt=at)
+    archive_filters = {"entity": "asset"}
+    if asset_ids is not None:
+        audit = audit.filter(entity_id__in=asset_ids)
+        history = history.filter(asset_id__in=asset_ids)
+        if len(asset_ids) == 1:
+            archive_filters["entity_id"] = asset_ids[0]
+    if len(upper) == len(states) and upper:
+        latest = max(upper.values())
+        audit = audit.filter(performed_at__lte=latest)
+        history = history.filter(moved_at__lte=latest)
+
+    def applies(asset_id: int, moment: datetime) -> bool:
+        return asset_id in states and (asset_id not in upper or moment <= upper[asset_id])
+
+    audit_rows = audit.order_by("-performed_at", "-id").values_list("entity_id", "performed_at", "changes")
+    archived = (
+        (entry.entity_id, entry.performed_at, entry.changes)
+        for entry in iter_archived(archive_filters, since=at)
+    )
+    # Archived entries are all older than the table rows, so this stays newest first.
+    for rows in (audit_rows.iterator(), archived):
+        for asset_id, moment, changes in rows:
+            if not applies(asset_id, moment):
+                continue
+            state = states[asset_id]
+            for key, attr in AUDIT_FIELDS.items():
+                change = changes.get(key)
+                if isinstance(change, dict) and "before" in change:
+                    value = change["before"]
+                    setattr(state, attr, list(value or []) if attr == "responsible_user_ids" else value)
+
+    for asset_id, moment, from_location_id in (
+        history.order_by("-moved_at", "-id").values_list("asset_id", "moved_at", "from_location_id").iterator()
+    ):
+        if applies(asset_id, moment) and from_location_id is not None:
+            states[asset_id].location_id = from_location_id
+
+
+def asset_state_at(asset_id: int, at) -> AssetState | None:
+    """State of one asset at ``at``, or None if it was not registered yet.
+
+    Starts from the nearest checkpoint taken at or after ``at`` (or the current
+    row) and replays only the changes in between.
+    """
+    at = as_moment(at)
+    row = Asset.objects.filter(pk=asset_id).values("created_at", "deleted_at").first()
+    if row is None or row["created_at"] > at:
+        return None
+    checkpoint = (
+        AssetStateCheckpoint.objects.filter(asset_id=asset_id, taken_at__gte=at)
+        .order_by("taken_at")
+        .values()
+        .first()
+    )
+    if checkpoint is not None:
+        states = {asset_id: _checkpoint_state(checkpoint)}
+        upper = {asset_id: checkpoint["taken_at"]}
+    else:
+        states = current_states([asset_id])
+        upper = {}
+    _replay(states, upper, at, [asset_id])
+    state = states[asset_id]
+    state.deleted = row["deleted_at"] is not None and row["deleted_at"] <= at
+    return state
+
+
+def inventory_state_at(at, include_deleted: bool = False) -> dict[int, AssetState]:
+    """Every asset registered by ``at`` and its state then, in one pass over the changes.
+
+    Assets covered by the first checkpoint batch after ``at`` start from it;
+    the rest start from their current row.
+    """
+    at = as_moment(at)
+    existing = dict(
+        Asset.objects.filter(created_at__lte=at).order_by().values_list("pk", "deleted_at").iterator()
+    )
+    states: dict[int, AssetState] = {}
+    upper: dict[int, datetime] = {}
+    taken_at = AssetStateCheckpoint.objects.filter(taken_at__gte=at).aggregate(first=Min("taken_at"))["first"]
+    if taken_at is not None:
+        for checkpoint in AssetStateCheckpoint.objects.filter(taken_at=taken_at).values().iterator():
+            if checkpoint["asset_id"] in existing:
+                states[checkpoint["asset_id"]] = _checkpoint_state(checkpoint)
+                upper[checkpoint["asset_id"]] = taken_at
+    missing = [pk for pk in existing if pk not in states]
+    if missing:
+        current = current_states(missing if len(missing) <= CURRENT_STATE_IN_LIMIT else None)
+        states.update({pk: current[pk] for pk in missing})
+    _replay(states, upper, at)
+    for pk, state in states.items():
+        state.deleted = existing[pk] is not None and existing[pk] <= at
+    if include_deleted:
+        return states
+    return {pk: state for pk, state in states.items() if not state.deleted}
@@ -25,12 +25,19 @@ urlpatterns = [
     path("lokasi/<int:pk>/edit/", views.LocationUpdateView.as_view(), name="location_update"),
     path("aset/", views.AssetListView.as_view(), name="asset_list"),
     path("aset/tambah/", views.AssetCreateView.as_view(), name="asset_create"),
+    path("aset/cari/", views.asset_search, name="asset_search"),
+    path("aset/impor/", views.asset_import, name="asset_import"),
+    path("aset/mutasi-massal/", views.asset_bulk_move, name="asset_bulk_move"),
+    path("aset/meter/impor/", views.meter_reading_import, name="meter_reading_import"),
     path("aset/<int:pk>/", views.AssetDetailView.as_view(), name="asset_detail"),
     path("aset/<int:pk>/edit/", views.AssetUpdateView.as_view(), name="asset_update"),
     path("aset/<int:pk>/mutasi/", views.AssetMoveView.as_view(), name="asset_move"),
     path("aset/<int:pk>/riwayat-lokasi/", views.AssetLocationHistoryListView.as_view(), name="asset_location_history"),
+    path("aset/<int:pk>/status-pada/", views.asset_state_at, name="asset_state_at"),
     path("aset/<int:pk>/hapus/", views.AssetDeleteView.as_view(), name="asset_delete"),
     path("aset/<int:pk>/label/", views.asset_label, name="asset_label"),
+    path("aset/label/massal/", views.asset_label_sheet, name="asset_label_sheet"),
+    path("aset/label/massal/pdf/", views.asset_label_sheet_pdf, name="asset_label_sheet_pdf"),
     path("aset/<int:pk>/foto/tambah/", views.AssetPhotoCreateView.as_view(), name="asset_photo_create"),
     path(
         "aset/<int:pk>/meter/tambah/",
@@ -57,6 +64,9 @@ urlpatterns = [
     path("laporan/aset/", views.AssetReportView.as_view(), name="asset_report"),
     path("laporan/aset/excel/", views.asset_report_excel, name="asset_report_excel"),
     path("laporan/aset/pdf/", views.asset_report_pdf, name="asset_report_pdf"),
+    path("laporan/aset/csv/", views.asset_report_csv, name="asset_report_csv"),
+    path("laporan/aset/ndjson/", views.asset_report_ndjson, name="asset_report_ndjson"),
+    path("laporan/ringkasan/", views.InventorySummaryReportView.as_view(), name="inventory_summary"),
     path("laporan/pemeliharaan/", views.MaintenanceReportView.as_view(), name="maintenance_report"),
     path(
         "laporan/pemeliharaan/excel/",
@@ -68,6 +78,23 @@ urlpatterns = [
         views.maintenance_report_pdf,
         name="maintenance_report_pdf",
     ),
+    path(
+        "laporan/pemeliharaan/csv/",
+        views.maintenance_report_csv,
+        name="maintenance_report_csv",
+    ),
+    path(
+        "laporan/pemeliharaan/ndjson/",
+        views.maintenance_report_ndjson,
+        name="maintenance_report_ndjson",
+    ),
+    path("laporan/ekspor/", views.ExportJobListView.as_view(), name="export_job_list"),
+    path("laporan/ekspor/<int:pk>/", views.export_job_status, name="export_job_status"),
+    path(
+        "laporan/ekspor/<int:pk>/unduh/",
+        views.export_job_download,
+        name="export_job_download",
+    ),
     path("audit/", views.AuditLogListView.as_view(), name="audit_log_list"),
     path("jadwal/options/", views.schedule_options, name="schedule_options"),
     path("aset/<int:pk>/label/download/", views.asset_qr_download, name="asset_qr_download"),
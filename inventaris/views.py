@@ -2,19 +2,51 @@ from __future__ import annotations
 
 from datetime import date, datetime
 
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-import base64
-from io import BytesIO
-
-from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
-from django.shortcuts import render
+import io
+import tempfile
+
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404, render
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DeleteView, DetailView, ListView, TemplateView, UpdateView
 from django.utils import timezone
-
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from . import export_cache, meters, search, summary, timetravel
+from .exports import (
+    ASSET_REPORT_FIELDS,
+    ASSET_REPORT_HEADER,
+    CSV_CONTENT_TYPE,
+    MAINTENANCE_REPORT_FIELDS,
+    MAINTENANCE_REPORT_HEADER,
+    NDJSON_CONTENT_TYPE,
+    REPORTS,
+    XLSX_CONTENT_TYPE,
+    asset_report_queryset,
+    asset_report_rows,
+    export_filename,
+    maintenance_report_queryset,
+    maintenance_report_rows,
+    render_report,
+    stream_csv,
+    stream_ndjson,
+)
 from .forms import (
+    AssetBulkMoveForm,
     AssetForm,
+    AssetImportForm,
     AssetDeleteForm,
     AssetMeterReadingForm,
     AssetMoveForm,
@@ -25,6 +57,7 @@ from .forms import (
     MaintenanceForm,
     MaintenancePhotoForm,
     MaintenanceScheduleForm,
+    MeterReadingImportForm,
 )
 from .models import (
     Asset,
@@ -34,14 +67,23 @@ from .models import (
     AssetPhoto,
     AuditLog,
     Category,
+    ExportJob,
     Loan,
     Location,
     Maintenance,
     MaintenancePhoto,
     MaintenanceSchedule,
+    ScheduleDueState,
 )
 from .utils import add_period, schedule_status
-from .mixins import RoleRequiredMixin
+from .asset_import import import_assets, records_from_file
+from .asset_moves import move_assets
+from .audit_archive import AUDIT_ORDERING, AuditKeysetPaginator, archived_count, filter_choices
+from .labels import label_items, label_sheet_queryset
+from .location_tree import get_location_tree
+from .mixins import KeysetPaginationMixin, RoleRequiredMixin
+from .pdf_report import write_label_sheet
+from .qr import cached_qr_png, qr_digest, qr_payload
 from .rbac import ALL_ROLES, ROLE_ADMIN, ROLE_SARPRAS, require_roles
 
 
@@ -54,43 +96,12 @@ class PublicHomeView(TemplateView):
         return super().dispatch(request, *args, **kwargs)
 
 
-def _parse_date(value: str | None) -> date | None:
-    if not value:
-        return None
-    try:
-        return datetime.strptime(value, "%Y-%m-%d").date()
-    except ValueError:
-        return None
-
-
 def _asset_report_queryset(request):
-    qs = Asset.objects.filter(deleted_at__isnull=True).select_related(
-        "category", "current_location"
-    )
-    status = request.GET.get("status")
-    category = request.GET.get("category")
-    location = request.GET.get("location")
-    if status:
-        qs = qs.filter(status=status)
-    if category:
-        qs = qs.filter(category_id=category)
-    if location:
-        qs = qs.filter(current_location_id=location)
-    return qs
+    return asset_report_queryset(request.GET)
 
 
 def _maintenance_report_queryset(request):
-    qs = Maintenance.objects.select_related("asset")
-    date_from = _parse_date(request.GET.get("from"))
-    date_to = _parse_date(request.GET.get("to"))
-    mtype = request.GET.get("type")
-    if date_from:
-        qs = qs.filter(performed_at__date__gte=date_from)
-    if date_to:
-        qs = qs.filter(performed_at__date__lte=date_to)
-    if mtype:
-        qs = qs.filter(type=mtype)
-    return qs.order_by("-performed_at")
+    return maintenance_report_queryset(request.GET)
 
 
 def _advance_schedule_after_maintenance(maintenance: Maintenance):
@@ -113,17 +124,10 @@ def _advance_schedule_after_maintenance(maintenance: Maintenance):
         return
 
     if schedule.trigger_type == MaintenanceSchedule.TRIGGER_USAGE:
-        latest_reading = (
-            AssetMeterReading.objects.filter(
-                asset=schedule.asset,
-                reading_type=schedule.usage_reading_type,
-            )
-            .order_by("-reading_at", "-id")
-            .first()
-        )
+        latest_usage = meters.latest_value(schedule.asset_id, schedule.usage_reading_type)
         current_usage = (
-            latest_reading.reading_value
-            if latest_reading
+            latest_usage
+            if latest_usage is not None
             else (schedule.last_usage_value or schedule.next_due_usage)
         )
         schedule.last_usage_value = current_usage
@@ -170,6 +174,9 @@ class LocationListView(RoleRequiredMixin, ListView):
     context_object_name = "locations"
     allowed_roles = ALL_ROLES
 
+    def get_queryset(self):
+        return get_location_tree().ordered
+
 
 class LocationCreateView(RoleRequiredMixin, CreateView):
     model = Location
@@ -187,16 +194,26 @@ class LocationUpdateView(RoleRequiredMixin, UpdateView):
     allowed_roles = (ROLE_ADMIN, ROLE_SARPRAS)
 
 
-class AssetListView(RoleRequiredMixin, ListView):
+class AssetListView(RoleRequiredMixin, KeysetPaginationMixin, ListView):
     model = Asset
     template_name = "inventaris/asset_list.html"
     context_object_name = "assets"
     allowed_roles = ALL_ROLES
+    keyset_ordering = ("code", "id")
 
     def get_queryset(self):
-        return Asset.objects.filter(deleted_at__isnull=True).select_related(
+        qs = Asset.objects.filter(deleted_at__isnull=True).select_related(
             "category", "current_location"
         )
+        location = self.request.GET.get("location")
+        if location:
+            qs = qs.filter(Location.subtree_q_for(location))
+        return search.filter_assets(qs, self.request.GET.get("q"))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["locations"] = Location.objects.all()
+        return context
 
 
 class AssetDetailView(RoleRequiredMixin, DetailView):
@@ -233,69 +250,41 @@ class AssetDetailView(RoleRequiredMixin, DetailView):
         return context
 
 
-class DashboardView(RoleRequiredMixin, ListView):
-    model = MaintenanceSchedule
+class DashboardView(RoleRequiredMixin, TemplateView):
     template_name = "inventaris/dashboard.html"
-    context_object_name = "schedules"
     allowed_roles = ALL_ROLES
 
-    def get_queryset(self):
-        return MaintenanceSchedule.objects.select_related("asset").order_by("next_due_date", "id")
+    def _states(self):
+        qs = ScheduleDueState.objects.select_related("schedule__asset")
+        location = self.request.GET.get("location")
+        if location:
+            qs = qs.filter(Location.subtree_q_for(location, "asset__current_location"))
+        return qs
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         today = date.today()
-        context["due_schedules"] = MaintenanceSchedule.objects.filter(
-            trigger_type=MaintenanceSchedule.TRIGGER_TIME,
-            next_due_date=today,
-        ).select_related("asset")
-        context["overdue_schedules"] = MaintenanceSchedule.objects.filter(
-            trigger_type=MaintenanceSchedule.TRIGGER_TIME,
-            next_due_date__lt=today,
-        ).select_related("asset")
-        usage_schedules = MaintenanceSchedule.objects.filter(
-            trigger_type=MaintenanceSchedule.TRIGGER_USAGE,
-            next_due_usage__isnull=False,
-            usage_reading_type__isnull=False,
-        ).select_related("asset")
-        latest_readings = (
-            AssetMeterReading.objects.filter(asset_id__in=usage_schedules.values("asset_id"))
-            .order_by("asset_id", "-reading_at", "-id")
+        states = self._states()
+        # Time-based rows are matched on the due date itself, so they stay
+        # correct between sweeps; usage rows rely on the maintained state.
+        time_states = states.filter(trigger_type=MaintenanceSchedule.TRIGGER_TIME)
+        context["due_schedules"] = [
+            state.schedule for state in time_states.filter(next_due_date=today)
+        ]
+        context["overdue_schedules"] = [
+            state.schedule
+            for state in time_states.filter(next_due_date__lt=today).order_by("next_due_date")
+        ]
+        usage_states = states.filter(trigger_type=MaintenanceSchedule.TRIGGER_USAGE)
+        context["usage_due_schedules"] = usage_states.filter(state=ScheduleDueState.STATE_DUE)
+        context["usage_warning_schedules"] = usage_states.filter(
+            state=ScheduleDueState.STATE_WARNING
+        )
+        context["usage_overdue_schedules"] = usage_states.filter(
+            state=ScheduleDueState.STATE_OVERDUE
         )
-        latest_by_asset_type = {}
-        for reading in latest_readings:
-            key = (reading.asset_id, reading.reading_type)
-            if key not in latest_by_asset_type:
-                latest_by_asset_type[key] = reading
-
-        usage_due_schedules = []
-        usage_warning_schedules = []
-        usage_overdue_schedules = []
-        for schedule in usage_schedules:
-            latest = latest_by_asset_type.get((schedule.asset_id, schedule.usage_reading_type))
-            current_usage = latest.reading_value if latest else schedule.last_usage_value
-            if current_usage is None:
-                continue
-            item = {
-                "schedule": schedule,
-                "current_usage": current_usage,
-                "next_due_usage": schedule.next_due_usage,
-            }
-            if current_usage > schedule.next_due_usage:
-                usage_overdue_schedules.append(item)
-            elif current_usage == schedule.next_due_usage:
-                usage_due_schedules.append(item)
-            elif (
-                schedule.usage_interval
-                and schedule.next_due_usage
-                and current_usage >= (schedule.next_due_usage - max(1, int(schedule.usage_interval * 0.1)))
-            ):
-                # Warning when remaining usage is in the last 10% interval.
-                usage_warning_schedules.append(item)
-        context["usage_due_schedules"] = usage_due_schedules
-        context["usage_warning_schedules"] = usage_warning_schedules
-        context["usage_overdue_schedules"] = usage_overdue_schedules
         context["today"] = today
+        context["locations"] = Location.objects.all()
         return context
 
 
@@ -330,15 +319,17 @@ class AssetUpdateView(RoleRequiredMixin, UpdateView):
     allowed_roles = (ROLE_ADMIN, ROLE_SARPRAS)
 
     def form_valid(self, form):
-        previous_location = self.object.current_location
+        # Validation has already copied the new location onto self.object;
+        # the form's initial data still holds the one it was loaded with.
+        previous_location_id = form.initial.get("current_location")
         asset = form.save(commit=False)
         asset.updated_by = self.request.user
         asset.save()
         form.save_m2m()
-        if previous_location != asset.current_location:
+        if previous_location_id != asset.current_location_id:
             AssetLocationHistory.objects.create(
                 asset=asset,
-                from_location=previous_location,
+                from_location_id=previous_location_id,
                 to_location=asset.current_location,
                 moved_by=self.request.user,
             )
@@ -384,6 +375,46 @@ class AssetMeterReadingCreateView(RoleRequiredMixin, CreateView):
         return HttpResponseRedirect(self.get_success_url())
 
 
+@login_required
+def asset_import(request):
+    require_roles(request.user, (ROLE_ADMIN, ROLE_SARPRAS))
+    result = None
+    form = AssetImportForm(request.POST or None, request.FILES or None)
+    if request.method == "POST" and form.is_valid():
+        upload = form.cleaned_data["file"]
+        try:
+            result = import_assets(
+                records_from_file(upload.file, upload.name), user=request.user
+            ).as_dict()
+        except ValueError as exc:
+            form.add_error("file", str(exc))
+        if result is not None and request.headers.get("x-requested-with") == "XMLHttpRequest":
+            return JsonResponse(result)
+    return render(request, "inventaris/asset_import.html", {"form": form, "result": result})
+
+
+@login_required
+def meter_reading_import(request):
+    require_roles(request.user, (ROLE_ADMIN, ROLE_SARPRAS))
+    result = None
+    form = MeterReadingImportForm(request.POST or None, request.FILES or None)
+    if request.method == "POST" and form.is_valid():
+        upload = form.cleaned_data["file"]
+        try:
+            with io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="") as fileobj:
+                result = meters.ingest_readings(
+                    meters.records_from_file(fileobj, upload.name),
+                    recorded_by=request.user,
+                ).as_dict()
+        except UnicodeDecodeError:
+            form.add_error("file", "File harus berenkoding UTF-8.")
+        except ValueError as exc:
+            form.add_error("file", str(exc))
+        if result is not None and request.headers.get("x-requested-with") == "XMLHttpRequest":
+            return JsonResponse(result)
+    return render(request, "inventaris/meter_reading_import.html", {"form": form, "result": result})
+
+
 class AssetMoveView(RoleRequiredMixin, UpdateView):
     model = Asset
     form_class = AssetMoveForm
@@ -423,6 +454,35 @@ class AssetMoveView(RoleRequiredMixin, UpdateView):
         return HttpResponseRedirect(self.get_success_url())
 
 
+@login_required
+def asset_bulk_move(request):
+    require_roles(request.user, (ROLE_ADMIN, ROLE_SARPRAS))
+    # The asset list posts only the selection; the confirm step adds the destination.
+    if request.method == "POST" and "to_location" in request.POST:
+        form = AssetBulkMoveForm(request.POST)
+        if form.is_valid():
+            moved = move_assets(
+                [asset.pk for asset in form.cleaned_data["assets"]],
+                form.cleaned_data["to_location"],
+                user=request.user,
+                note=form.cleaned_data["note"],
+                moved_at=form.cleaned_data["moved_at"],
+            )
+            if request.headers.get("x-requested-with") == "XMLHttpRequest":
+                return JsonResponse({"moved": moved})
+            return HttpResponseRedirect(reverse_lazy("inventaris:asset_list"))
+        selected_ids = request.POST.getlist("assets")
+    else:
+        selected_ids = request.POST.getlist("assets") or request.GET.getlist("assets")
+        form = AssetBulkMoveForm(initial={"assets": selected_ids, "moved_at": timezone.now()})
+    selected = (
+        Asset.objects.filter(pk__in=[pk for pk in selected_ids if pk.isdigit()], deleted_at__isnull=True)
+        .select_related("current_location")
+        .order_by("code", "id")
+    )
+    return render(request, "inventaris/asset_bulk_move.html", {"form": form, "selected": selected})
+
+
 class AssetLocationHistoryListView(RoleRequiredMixin, ListView):
     model = AssetLocationHistory
     template_name = "inventaris/asset_location_history.html"
@@ -682,54 +742,88 @@ class LoanUpdateView(RoleRequiredMixin, UpdateView):
         return HttpResponseRedirect(self.get_success_url())
 
 
-class AssetReportView(RoleRequiredMixin, ListView):
+class AssetReportView(RoleRequiredMixin, KeysetPaginationMixin, ListView):
     model = Asset
     template_name = "inventaris/asset_report.html"
     context_object_name = "assets"
     allowed_roles = ALL_ROLES
+    keyset_ordering = ("code", "id")
 
     def get_queryset(self):
         return _asset_report_queryset(self.request)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context["status_choices"] = Asset.STATUS_CHOICES
         context["categories"] = Category.objects.all()
         context["locations"] = Location.objects.all()
         return context
 
 
-class AuditLogListView(RoleRequiredMixin, ListView):
+class InventorySummaryReportView(RoleRequiredMixin, TemplateView):
+    template_name = "inventaris/inventory_summary.html"
+    allowed_roles = ALL_ROLES
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        rows = self.request.GET.get("rows")
+        cols = self.request.GET.get("cols")
+        rows = rows if rows in summary.DIMENSIONS else "category"
+        cols = cols if cols in summary.DIMENSIONS else "status"
+        try:
+            level = max(0, int(self.request.GET.get("level") or 0))
+        except ValueError:
+            level = 0
+        context["pivot"] = summary.pivot(rows, cols, self.request.GET, level=level)
+        context["rows"] = rows
+        context["cols"] = cols
+        context["dimensions"] = summary.DIMENSIONS.items()
+        context["status_choices"] = Asset.STATUS_CHOICES
+        context["condition_choices"] = Asset.CONDITION_CHOICES
+        context["categories"] = Category.objects.all()
+        context["locations"] = Location.objects.all()
+        return context
+
+
+class AuditLogListView(RoleRequiredMixin, KeysetPaginationMixin, ListView):
     model = AuditLog
     template_name = "inventaris/audit_log_list.html"
     context_object_name = "logs"
-    paginate_by = 50
     allowed_roles = ALL_ROLES
+    keyset_ordering = AUDIT_ORDERING
 
     def get_queryset(self):
-        qs = AuditLog.objects.select_related("performed_by").order_by("-performed_at")
+        qs = AuditLog.objects.select_related("performed_by")
         entity = self.request.GET.get("entity")
+        entity_id = self.request.GET.get("entity_id", "")
         action = self.request.GET.get("action")
-        user_id = self.request.GET.get("user")
+        user_id = self.request.GET.get("user", "")
+        self.audit_filters = {}
         if entity:
             qs = qs.filter(entity=entity)
+            self.audit_filters["entity"] = entity
+        if entity_id.isdigit():
+            qs = qs.filter(entity_id=entity_id)
+            self.audit_filters["entity_id"] = int(entity_id)
         if action:
             qs = qs.filter(action=action)
-        if user_id:
+            self.audit_filters["action"] = action
+        if user_id.isdigit():
             qs = qs.filter(performed_by_id=user_id)
+            self.audit_filters["performed_by_id"] = int(user_id)
         return qs
 
+    def get_keyset_paginator(self, queryset, page_size):
+        # Entries moved out by archive_audit_log continue after the table rows.
+        return AuditKeysetPaginator(queryset, page_size, self.audit_filters)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["entities"] = (
-            AuditLog.objects.order_by()
-            .values_list("entity", flat=True)
-            .distinct()
-        )
-        context["actions"] = (
-            AuditLog.objects.order_by()
-            .values_list("action", flat=True)
-            .distinct()
-        )
+        if context["approximate_count"] is not None:
+            context["approximate_count"] += archived_count(self.audit_filters)
+        choices = filter_choices()
+        context["entities"] = choices["entity"]
+        context["actions"] = choices["action"]
         return context
 
 
@@ -758,64 +852,112 @@ def schedule_options(request):
     return JsonResponse({"options": options})
 
 
+@login_required
+def asset_search(request):
+    require_roles(request.user, ALL_ROLES)
+    asset_ids = search.ranked_asset_ids(request.GET.get("q"))
+    assets = Asset.objects.select_related("category", "current_location").in_bulk(asset_ids)
+    results = []
+    for asset_id in asset_ids:
+        asset = assets.get(asset_id)
+        if asset is None or asset.deleted_at:
+            continue
+        results.append(
+            {
+                "id": asset.id,
+                "code": asset.code,
+                "name": asset.name,
+                "category": asset.category.name,
+                "location": asset.current_location.name,
+                "url": reverse_lazy("inventaris:asset_detail", args=[asset.id]),
+            }
+        )
+    return JsonResponse({"results": results})
+
+
+@login_required
+def asset_state_at(request, pk: int):
+    require_roles(request.user, ALL_ROLES)
+    try:
+        day = datetime.strptime(request.GET.get("tanggal", ""), "%Y-%m-%d").date()
+    except ValueError:
+        return JsonResponse({"error": "Parameter tanggal harus YYYY-MM-DD."}, status=400)
+    get_object_or_404(Asset, pk=pk)
+    state = timetravel.asset_state_at(pk, day)
+    if state is None:
+        return JsonResponse({"date": day.isoformat(), "state": None})
+    data = state.as_dict()
+    data["location"] = (
+        Location.objects.filter(pk=state.location_id).values_list("name", flat=True).first()
+    )
+    data["responsible_users"] = list(
+        get_user_model().objects.filter(pk__in=state.responsible_user_ids).values_list("username", flat=True)
+    )
+    return JsonResponse({"date": day.isoformat(), "state": data})
+
+
+def _cached_report_response(request, report_type: str, file_format: str, content_type: str):
+    key = export_cache.cache_key(report_type, file_format, request.GET)
+    fileobj = export_cache.get(key)
+    if fileobj is None:
+        fileobj = export_cache.render(
+            key,
+            lambda target: render_report(report_type, file_format, request.GET, target),
+        )
+    return FileResponse(
+        fileobj,
+        as_attachment=True,
+        filename=export_filename(report_type, file_format),
+        content_type=content_type,
+    )
+
+
 @login_required
 def asset_report_excel(request):
     require_roles(request.user, ALL_ROLES)
-    queryset = _asset_report_queryset(request)
     try:
-        from openpyxl import Workbook
+        import openpyxl  # noqa: F401
     except ImportError:
         return HttpResponse("openpyxl belum terpasang.")
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Aset"
-    ws.append(["Kode", "Nama", "Kategori", "Lokasi", "Status", "Kondisi"])
-    for item in queryset:
-        ws.append(
-            [
-                item.code,
-                item.name,
-                str(item.category),
-                str(item.current_location),
-                item.get_status_display(),
-                item.get_condition_display(),
-            ]
-        )
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    return _cached_report_response(
+        request, ExportJob.REPORT_ASSET, ExportJob.FORMAT_XLSX, XLSX_CONTENT_TYPE
+    )
+
+
+@login_required
+def asset_report_csv(request):
+    require_roles(request.user, ALL_ROLES)
+    queryset = _asset_report_queryset(request)
+    response = StreamingHttpResponse(
+        stream_csv(ASSET_REPORT_HEADER, asset_report_rows(queryset)),
+        content_type=CSV_CONTENT_TYPE,
     )
-    response["Content-Disposition"] = "attachment; filename=laporan_aset.xlsx"
-    wb.save(response)
+    response["Content-Disposition"] = "attachment; filename=laporan_aset.csv"
     return response
 
 
 @login_required
-def asset_report_pdf(request):
+def asset_report_ndjson(request):
     require_roles(request.user, ALL_ROLES)
     queryset = _asset_report_queryset(request)
+    response = StreamingHttpResponse(
+        stream_ndjson(ASSET_REPORT_FIELDS, asset_report_rows(queryset)),
+        content_type=NDJSON_CONTENT_TYPE,
+    )
+    response["Content-Disposition"] = "attachment; filename=laporan_aset.ndjson"
+    return response
+
+
+@login_required
+def asset_report_pdf(request):
+    require_roles(request.user, ALL_ROLES)
     try:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.pdfgen import canvas
+        import reportlab  # noqa: F401
     except ImportError:
         return HttpResponse("reportlab belum terpasang.")
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = "attachment; filename=laporan_aset.pdf"
-    p = canvas.Canvas(response, pagesize=A4)
-    width, height = A4
-    y = height - 40
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(40, y, "Laporan Aset")
-    y -= 20
-    p.setFont("Helvetica", 10)
-    for item in queryset:
-        line = f"{item.code} | {item.name} | {item.category} | {item.current_location} | {item.get_status_display()} | {item.get_condition_display()}"
-        p.drawString(40, y, line[:120])
-        y -= 14
-        if y < 60:
-            p.showPage()
-            y = height - 40
-    p.save()
-    return response
+    return _cached_report_response(
+        request, ExportJob.REPORT_ASSET, ExportJob.FORMAT_PDF, "application/pdf"
+    )
 
 
 class MaintenanceReportView(RoleRequiredMixin, ListView):
@@ -827,96 +969,151 @@ class MaintenanceReportView(RoleRequiredMixin, ListView):
     def get_queryset(self):
         return _maintenance_report_queryset(self.request)
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["locations"] = Location.objects.all()
+        return context
+
 
 @login_required
 def maintenance_report_excel(request):
     require_roles(request.user, ALL_ROLES)
-    queryset = _maintenance_report_queryset(request)
     try:
-        from openpyxl import Workbook
+        import openpyxl  # noqa: F401
     except ImportError:
         return HttpResponse("openpyxl belum terpasang.")
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Pemeliharaan"
-    ws.append(["Aset", "Tipe", "Tanggal", "Kondisi Sebelum", "Kondisi Sesudah", "Biaya"])
-    for item in queryset:
-        ws.append(
-            [
-                str(item.asset),
-                item.get_type_display(),
-                item.performed_at.strftime("%Y-%m-%d %H:%M"),
-                item.get_condition_before_display(),
-                item.get_condition_after_display(),
-                float(item.cost),
-            ]
-        )
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    return _cached_report_response(
+        request, ExportJob.REPORT_MAINTENANCE, ExportJob.FORMAT_XLSX, XLSX_CONTENT_TYPE
+    )
+
+
+@login_required
+def maintenance_report_csv(request):
+    require_roles(request.user, ALL_ROLES)
+    queryset = _maintenance_report_queryset(request)
+    response = StreamingHttpResponse(
+        stream_csv(MAINTENANCE_REPORT_HEADER, maintenance_report_rows(queryset)),
+        content_type=CSV_CONTENT_TYPE,
     )
-    response["Content-Disposition"] = "attachment; filename=laporan_pemeliharaan.xlsx"
-    wb.save(response)
+    response["Content-Disposition"] = "attachment; filename=laporan_pemeliharaan.csv"
     return response
 
 
 @login_required
-def maintenance_report_pdf(request):
+def maintenance_report_ndjson(request):
     require_roles(request.user, ALL_ROLES)
     queryset = _maintenance_report_queryset(request)
+    response = StreamingHttpResponse(
+        stream_ndjson(MAINTENANCE_REPORT_FIELDS, maintenance_report_rows(queryset)),
+        content_type=NDJSON_CONTENT_TYPE,
+    )
+    response["Content-Disposition"] = "attachment; filename=laporan_pemeliharaan.ndjson"
+    return response
+
+
+@login_required
+def maintenance_report_pdf(request):
+    require_roles(request.user, ALL_ROLES)
     try:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.pdfgen import canvas
+        import reportlab  # noqa: F401
     except ImportError:
         return HttpResponse("reportlab belum terpasang.")
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = "attachment; filename=laporan_pemeliharaan.pdf"
-    p = canvas.Canvas(response, pagesize=A4)
-    width, height = A4
-    y = height - 40
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(40, y, "Laporan Pemeliharaan")
-    y -= 20
-    p.setFont("Helvetica", 10)
-    for item in queryset:
-        line = (
-            f"{item.asset} | {item.get_type_display()} | {item.performed_at.strftime('%Y-%m-%d')} "
-            f"| {item.get_condition_before_display()} -> {item.get_condition_after_display()} | {float(item.cost)}"
+    return _cached_report_response(
+        request, ExportJob.REPORT_MAINTENANCE, ExportJob.FORMAT_PDF, "application/pdf"
+    )
+
+
+def _export_job_payload(job: ExportJob) -> dict:
+    return {
+        "id": job.pk,
+        "report_type": job.report_type,
+        "file_format": job.file_format,
+        "status": job.status,
+        "status_label": job.get_status_display(),
+        "rows_total": job.rows_total,
+        "rows_processed": job.rows_processed,
+        "progress": job.progress_percent,
+        "error": job.error,
+        "status_url": reverse_lazy("inventaris:export_job_status", kwargs={"pk": job.pk}),
+        "download_url": reverse_lazy("inventaris:export_job_download", kwargs={"pk": job.pk})
+        if job.status == ExportJob.STATUS_DONE
+        else None,
+    }
+
+
+class ExportJobListView(RoleRequiredMixin, ListView):
+    model = ExportJob
+    template_name = "inventaris/export_job_list.html"
+    context_object_name = "jobs"
+    allowed_roles = ALL_ROLES
+
+    def get_queryset(self):
+        return ExportJob.objects.filter(requested_by=self.request.user)[:50]
+
+    def post(self, request, *args, **kwargs):
+        report_type = request.POST.get("report_type")
+        file_format = request.POST.get("file_format")
+        if report_type not in REPORTS or file_format not in dict(ExportJob.FORMAT_CHOICES):
+            return HttpResponseBadRequest("Jenis laporan atau format tidak valid.")
+        params = {
+            key: request.POST[key]
+            for key in REPORTS[report_type]["filters"]
+            if request.POST.get(key)
+        }
+        job = ExportJob.objects.create(
+            report_type=report_type,
+            file_format=file_format,
+            params=params,
+            requested_by=request.user,
         )
-        p.drawString(40, y, line[:120])
-        y -= 14
-        if y < 60:
-            p.showPage()
-            y = height - 40
-    p.save()
-    return response
+        if request.headers.get("x-requested-with") == "XMLHttpRequest":
+            return JsonResponse(_export_job_payload(job), status=202)
+        return HttpResponseRedirect(reverse_lazy("inventaris:export_job_list"))
+
+
+@login_required
+def export_job_status(request, pk: int):
+    require_roles(request.user, ALL_ROLES)
+    job = get_object_or_404(ExportJob, pk=pk, requested_by=request.user)
+    return JsonResponse(_export_job_payload(job))
+
+
+@login_required
+def export_job_download(request, pk: int):
+    require_roles(request.user, ALL_ROLES)
+    job = get_object_or_404(
+        ExportJob,
+        pk=pk,
+        requested_by=request.user,
+        status=ExportJob.STATUS_DONE,
+    )
+    if not job.file or (job.expires_at and job.expires_at <= timezone.now()):
+        raise Http404("File export sudah kedaluwarsa.")
+    return FileResponse(
+        job.file.open("rb"),
+        as_attachment=True,
+        filename=export_filename(job.report_type, job.file_format),
+    )
+
+
+def _asset_scan_url(request, pk: int) -> str:
+    detail_url = request.build_absolute_uri(
+        reverse_lazy("inventaris:asset_detail", kwargs={"pk": pk})
+    )
+    return f"{detail_url}?scan=1"
 
 
 @login_required
 def asset_label(request, pk: int):
     require_roles(request.user, (ROLE_ADMIN, ROLE_SARPRAS))
     asset = Asset.objects.select_related("category", "current_location").get(pk=pk)
-    detail_url = request.build_absolute_uri(
-        reverse_lazy("inventaris:asset_detail", kwargs={"pk": asset.pk})
-    )
-    scan_url = f"{detail_url}?scan=1"
-    qr_text = f"{asset.code} | {asset.name} | {scan_url}"
-    try:
-        import qrcode
-    except ImportError:
-        return HttpResponse("qrcode belum terpasang.")
-    qr = qrcode.QRCode(border=2, box_size=4)
-    qr.add_data(qr_text)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    buffer = BytesIO()
-    img.save(buffer, format="PNG")
-    qr_b64 = base64.b64encode(buffer.getvalue()).decode("ascii")
+    scan_url = _asset_scan_url(request, asset.pk)
     return render(
         request,
         "inventaris/asset_label.html",
         {
             "asset": asset,
-            "qr_b64": qr_b64,
+            "qr_version": qr_digest(qr_payload(asset.code, asset.name, scan_url)),
             "detail_url": scan_url,
         },
     )
@@ -925,22 +1122,71 @@ def asset_label(request, pk: int):
 @login_required
 def asset_qr_download(request, pk: int):
     require_roles(request.user, (ROLE_ADMIN, ROLE_SARPRAS))
-    asset = Asset.objects.select_related("category", "current_location").get(pk=pk)
-    detail_url = request.build_absolute_uri(
-        reverse_lazy("inventaris:asset_detail", kwargs={"pk": asset.pk})
+    asset = Asset.objects.only("pk", "code", "name").get(pk=pk)
+    payload = qr_payload(asset.code, asset.name, _asset_scan_url(request, asset.pk))
+    digest = qr_digest(payload)
+    etag = f'"{digest}"'
+    # A URL carrying the current digest can never point at different bytes,
+    # so it may be cached for good; other requests revalidate via the ETag.
+    versioned = request.GET.get("v") == digest
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is None:
+        try:
+            png = cached_qr_png(payload, settings.QR_CACHE_DIR)
+        except ImportError:
+            return HttpResponse("qrcode belum terpasang.")
+        response = HttpResponse(png, content_type="image/png")
+        disposition = "inline" if versioned else "attachment"
+        response["Content-Disposition"] = f"{disposition}; filename={asset.code}_qrcode.png"
+    else:
+        response = not_modified
+    response["ETag"] = etag
+    if versioned:
+        patch_cache_control(response, private=True, max_age=60 * 60 * 24 * 365, immutable=True)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required
+def asset_label_sheet(request):
+    require_roles(request.user, (ROLE_ADMIN, ROLE_SARPRAS))
+    return render(
+        request,
+        "inventaris/asset_label_sheet.html",
+        {
+            "categories": Category.objects.all(),
+            "locations": Location.objects.all(),
+        },
     )
-    scan_url = f"{detail_url}?scan=1"
-    qr_text = f"{asset.code} | {asset.name} | {scan_url}"
+
+
+@login_required
+def asset_label_sheet_pdf(request):
+    require_roles(request.user, (ROLE_ADMIN, ROLE_SARPRAS))
     try:
-        import qrcode
+        import qrcode  # noqa: F401
+        import reportlab  # noqa: F401
     except ImportError:
-        return HttpResponse("qrcode belum terpasang.")
-    qr = qrcode.QRCode(border=2, box_size=4)
-    qr.add_data(qr_text)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    buffer = BytesIO()
-    img.save(buffer, format="PNG")
-    response = HttpResponse(buffer.getvalue(), content_type="image/png")
-    response["Content-Disposition"] = f"attachment; filename={asset.code}_qrcode.png"
-    return response
+        return HttpResponse("qrcode/reportlab belum terpasang.")
+    try:
+        queryset = label_sheet_queryset(
+            location_id=request.GET.get("location"),
+            category_id=request.GET.get("category"),
+        )
+    except (Location.DoesNotExist, ValueError):
+        raise Http404("Lokasi tidak ditemukan.")
+    spool = tempfile.TemporaryFile()
+    write_label_sheet(
+        spool,
+        label_items(queryset, lambda pk: _asset_scan_url(request, pk)),
+        workers=1,
+        qr_cache_dir=settings.QR_CACHE_DIR,
+    )
+    spool.seek(0)
+    return FileResponse(
+        spool,
+        as_attachment=True,
+        filename="label_aset.pdf",
+        content_type="application/pdf",
+    )